@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Import-Time Regression Check
+Imports watchdog.py and health_fetcher.py under `python -X importtime` and
+fails if either pulls in a module it should import lazily, or if its
+cumulative import time exceeds the budget.
+
+Bytecode is compiled into a throwaway PYTHONPYCACHEPREFIX first (even
+under PYTHONDONTWRITEBYTECODE), and the best of MEASURED_RUNS is
+compared, so the numbers reflect a warm install rather than a recompile
+or a noisy sample.
+
+Usage:
+    python3 bench/check_import_time.py [--budget-ms 15]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# script module -> (directory, modules that must stay out of import time)
+TARGETS = {
+    "watchdog": ("layer1-watchdog", {"subprocess", "json", "shutil", "socket", "base64"}),
+    "health_fetcher": ("layer2-audit", {"subprocess", "traceback", "sqlite3", "gzip"}),
+}
+MEASURED_RUNS = 3  # Import timings are noisy; the best run is compared to the budget
+
+
+def import_profile(module, directory, pycache):
+    """Return ({imported module: cumulative_us}, module_cumulative_us) for one import."""
+    code = f"import sys; sys.path.insert(0, {os.path.join(REPO_DIR, directory)!r}); import {module}"
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    # First run populates the bytecode cache; the fastest of the rest is kept
+    best = None
+    for attempt in range(1 + MEASURED_RUNS):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+        if attempt == 0:
+            continue
+
+        # Lines look like: "import time:  self [us] | cumulative | imported package"
+        baseline = set(_startup_modules())
+        imported = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            name = name.strip()
+            if name not in baseline:
+                imported[name] = int(cumulative)
+        if best is None or imported.get(module, 0) < best[1]:
+            best = (imported, imported.get(module, 0))
+    return best
+
+
+_startup_cache = None
+
+
+def _startup_modules():
+    """Modules the bare interpreter already imports, which cost scripts nothing."""
+    global _startup_cache
+    if _startup_cache is None:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "pass"],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+        )
+        _startup_cache = [
+            line.rsplit("|", 1)[-1].strip()
+            for line in result.stderr.splitlines()
+            if line.startswith("import time:") and "cumulative" not in line
+        ]
+    return _startup_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check script import time")
+    parser.add_argument("--budget-ms", type=float, default=15.0,
+                        help="Maximum cumulative import time per script")
+    args = parser.parse_args()
+
+    failed = False
+    pycache = tempfile.mkdtemp(prefix="guardian-pycache-")
+    for module, (directory, forbidden) in TARGETS.items():
+        imported, cumulative_us = import_profile(module, directory, pycache)
+        leaked = sorted(forbidden & set(imported))
+        status = "ok"
+        if leaked:
+            status = f"FAIL eager imports: {', '.join(leaked)}"
+            failed = True
+        elif cumulative_us / 1000 > args.budget_ms:
+            status = f"FAIL over {args.budget_ms:.0f}ms budget"
+            failed = True
+        print(f"{module:<15} {cumulative_us / 1000:6.1f}ms  {status}")
+
+    shutil.rmtree(pycache, ignore_errors=True)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
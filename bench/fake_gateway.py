@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Fake OpenClaw Gateway - Benchmark Stand-in
+TCP listener on the configured port that answers the watchdog's WebSocket
+upgrade probe. Health is shared with fake_openclaw.py through gateway.json
+in the state directory, so a scripted `gateway restart` can bring it back.
+"""
+import argparse
+import json
+import os
+import socket
+import threading
+import time
+
+STATE_NAME = "gateway.json"
+
+
+def read_gateway_state(state_dir):
+    """Read shared gateway state: {"up": bool, "up_at": epoch or None}."""
+    try:
+        with open(os.path.join(state_dir, STATE_NAME), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"up": True, "up_at": None}
+
+
+def write_gateway_state(state_dir, up, up_at=None):
+    """Atomically replace shared gateway state."""
+    path = os.path.join(state_dir, STATE_NAME)
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump({"up": up, "up_at": up_at}, f)
+    os.replace(tmp, path)
+
+
+def gateway_is_up(state_dir):
+    """Gateway is up if flagged up, or once a scheduled recovery time passes."""
+    state = read_gateway_state(state_dir)
+    if state.get("up"):
+        return True
+    up_at = state.get("up_at")
+    return up_at is not None and time.time() >= up_at
+
+
+class FakeGateway:
+    """Threaded TCP server answering `GET /health` WebSocket upgrades."""
+
+    def __init__(self, port, state_dir):
+        self.port = port
+        self.state_dir = state_dir
+        self.connections = 0
+        self._sock = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("127.0.0.1", self.port))
+        self._sock.listen(16)
+        self._sock.settimeout(0.2)
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+        if self._sock:
+            self._sock.close()
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.connections += 1
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            conn.settimeout(2)
+            try:
+                request = conn.recv(1024).decode("ascii", errors="ignore")
+            except OSError:
+                return
+            if not request:
+                return  # Plain TCP port check
+            if gateway_is_up(self.state_dir) and "upgrade: websocket" in request.lower():
+                response = (
+                    "HTTP/1.1 101 Switching Protocols\r\n"
+                    "Upgrade: websocket\r\n"
+                    "Connection: Upgrade\r\n"
+                    "\r\n"
+                )
+            else:
+                response = "HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\n\r\n"
+            try:
+                conn.sendall(response.encode("ascii"))
+            except OSError:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake OpenClaw gateway")
+    parser.add_argument("--port", type=int, default=18789)
+    parser.add_argument("--state-dir", default=".")
+    args = parser.parse_args()
+
+    gateway = FakeGateway(args.port, args.state_dir).start()
+    print(f"Fake gateway listening on 127.0.0.1:{args.port} (state: {args.state_dir})")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        gateway.stop()
+
+
+if __name__ == "__main__":
+    main()
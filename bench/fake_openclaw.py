@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Fake OpenClaw CLI - Benchmark Stand-in
+Answers the subcommands the watchdog uses (`sessions spawn`, `gateway restart`,
+`message send`) with scripted latency and failures.
+
+Behaviour comes from $FAKE_OPENCLAW_DIR/scenario.json:
+    {
+      "latency": {"sessions spawn": 0.05, "gateway restart": 0.2},
+      "recover_after": 1.0,          # seconds after `gateway restart` until healthy
+      "down_stderr": "Error: connect ECONNREFUSED 127.0.0.1:18789",
+      "script": {"sessions spawn": [{"latency": 0.1, "returncode": 1, "stderr": "..."}]}
+    }
+Entries under "script" are consumed in order, then the defaults apply.
+"""
+import json
+import os
+import sys
+import time
+
+from fake_gateway import gateway_is_up, write_gateway_state
+
+DEFAULT_SCENARIO = {
+    "latency": {},
+    "recover_after": 1.0,
+    "down_stderr": "Error: connect ECONNREFUSED 127.0.0.1:18789",
+    "script": {},
+}
+
+
+def load_scenario(state_dir):
+    scenario = dict(DEFAULT_SCENARIO)
+    try:
+        with open(os.path.join(state_dir, "scenario.json"), "r") as f:
+            scenario.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    return scenario
+
+
+def next_scripted(state_dir, scenario, command):
+    """Pop the next scripted response for a command, tracking position in counters.json."""
+    steps = scenario["script"].get(command, [])
+    if not steps:
+        return None
+    counters_path = os.path.join(state_dir, "counters.json")
+    try:
+        with open(counters_path, "r") as f:
+            counters = json.load(f)
+    except (OSError, ValueError):
+        counters = {}
+    index = counters.get(command, 0)
+    counters[command] = index + 1
+    with open(counters_path, "w") as f:
+        json.dump(counters, f)
+    return steps[index] if index < len(steps) else None
+
+
+def main(argv):
+    state_dir = os.environ.get("FAKE_OPENCLAW_DIR", ".")
+    scenario = load_scenario(state_dir)
+    command = " ".join(argv[:2])
+
+    step = next_scripted(state_dir, scenario, command)
+    if step is not None:
+        time.sleep(step.get("latency", 0))
+        if step.get("stdout"):
+            print(step["stdout"])
+        if step.get("stderr"):
+            print(step["stderr"], file=sys.stderr)
+        return step.get("returncode", 0)
+
+    time.sleep(scenario["latency"].get(command, 0))
+
+    if command == "sessions spawn":
+        if gateway_is_up(state_dir):
+            print("OK")
+            return 0
+        print(scenario["down_stderr"], file=sys.stderr)
+        return 1
+
+    if command == "gateway restart":
+        write_gateway_state(state_dir, up=False, up_at=time.time() + scenario["recover_after"])
+        print("Gateway restarting")
+        return 0
+
+    # message send and anything else succeed silently
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Synthetic gateway.log Generator
+Writes a gateway.log of a target size whose timestamps span the last N hours,
+mixing routine lines with the LLM error lines health_fetcher.py looks for.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timezone
+
+ROUTINE_LINES = [
+    "[gateway] agent model: anthropic/claude-sonnet-4",
+    "[ws] client connected id=c{n}",
+    "[ws] client disconnected id=c{n} code=1000",
+    "[agent] session s{n} completed in {n}ms",
+    "[cron] job heartbeat-{n} finished status=ok",
+    "[gateway] request /v1/sessions 200 {n}ms",
+]
+
+ERROR_LINES = [
+    "[llm] No available auth profile for moonshot (all in cooldown or unavailable)",
+    "[llm] No available auth profile for google unavailable",
+    "[llm] FailoverError: LLM request failed: rate limit exceeded (429)",
+    "[llm] FailoverError: LLM request timed out after 60000ms",
+    "[llm] Profile anthropic:default timed out",
+    "[llm] authentication_error: Invalid bearer token",
+    "[gateway] Restarting after SIGUSR1",
+    "[gateway] switching to fallback model openai/gpt-4.1",
+]
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_size(text):
+    """Parse sizes like 512K, 64M, 2G into bytes."""
+    text = text.strip().upper().rstrip("B")
+    unit = text[-1] if text and text[-1] in SIZE_UNITS else ""
+    number = text[:-1] if unit else text
+    return int(float(number) * SIZE_UNITS[unit])
+
+
+def generate_log(path, size_bytes, hours=24, error_rate=0.02, end=None, seed=0):
+    """Write ~size_bytes of log lines spread evenly over `hours` ending at `end`.
+
+    Returns (bytes_written, lines_written).
+    """
+    rng = random.Random(seed)
+    end = end if end is not None else time.time()
+    avg_line = 90
+    total_lines = max(1, size_bytes // avg_line)
+    start = end - hours * 3600
+    step = (end - start) / total_lines
+
+    written = 0
+    lines = 0
+    chunk = []
+    ts = start
+    last_second = None
+    prefix = ""
+    with open(path, "w", encoding="utf-8") as f:
+        while written < size_bytes:
+            second = int(ts)
+            if second != last_second:
+                prefix = datetime.fromtimestamp(second, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+                last_second = second
+            if rng.random() < error_rate:
+                message = rng.choice(ERROR_LINES)
+            else:
+                message = rng.choice(ROUTINE_LINES).format(n=rng.randrange(10000))
+            line = f"{prefix}.{int((ts - second) * 1000):03d}Z {message}\n"
+            chunk.append(line)
+            written += len(line)
+            lines += 1
+            ts = min(ts + step, end)
+            if len(chunk) >= 10000:
+                f.write("".join(chunk))
+                chunk = []
+        f.write("".join(chunk))
+    return written, lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic gateway.log")
+    parser.add_argument("--out", required=True, help="Output path")
+    parser.add_argument("--size", default="64M", help="Target size, e.g. 512K, 64M, 2G")
+    parser.add_argument("--hours", type=float, default=24, help="Time span covered by the log")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Fraction of LLM error lines")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start_t = time.time()
+    written, lines = generate_log(args.out, parse_size(args.size), args.hours, args.error_rate, seed=args.seed)
+    duration = time.time() - start_t
+    print(f"Wrote {lines} lines ({written / 1024 ** 2:.1f} MB) to {args.out} in {duration:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
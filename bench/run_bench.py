@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+OpenClaw Guardian Benchmarks
+Runs watchdog.py and health_fetcher.py against a sandboxed $HOME with a fake
+gateway (fake_gateway.py), a scriptable fake CLI (fake_openclaw.py) and
+synthetic logs (gen_gateway_log.py), and reports:
+
+- probe:    wall time and CPU cost of one healthy watchdog run
+- recovery: detection latency and time to recovery after a gateway failure
+- fetcher:  health_fetcher.py throughput and peak RSS per log size, cold (first
+            run, rollup backfill reads the whole log) and warm (second run,
+            only the report window is read)
+
+Usage:
+    python3 bench/run_bench.py
+    python3 bench/run_bench.py --only fetcher --log-sizes 1M,64M,1G --json bench.json
+"""
+import argparse
+import importlib.util
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+WATCHDOG = os.path.join(REPO_DIR, "layer1-watchdog", "watchdog.py")
+FETCHER = os.path.join(REPO_DIR, "layer2-audit", "health_fetcher.py")
+
+sys.path.insert(0, BENCH_DIR)
+from fake_gateway import FakeGateway, write_gateway_state  # noqa: E402
+from gen_gateway_log import generate_log, parse_size  # noqa: E402
+
+FAILURE_STDERR = {
+    "CONNECTION": "Error: connect ECONNREFUSED 127.0.0.1",
+    "TIMEOUT": "Error: gateway timeout after 25s",
+    "AUTH_ERROR": "Error: auth token rejected by gateway",
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Sandbox:
+    """Throwaway $HOME laid out like a real OpenClaw install, wired to the fakes."""
+
+    def __init__(self, root, scenario=None):
+        self.home = os.path.join(root, "home")
+        self.state_dir = os.path.join(root, "fake-state")
+        self.port = free_port()
+        openclaw_dir = os.path.join(self.home, ".openclaw")
+        bin_dir = os.path.join(self.home, ".npm-global", "bin")
+        for path in (self.state_dir, bin_dir,
+                     os.path.join(openclaw_dir, "guardian"),
+                     os.path.join(openclaw_dir, "logs")):
+            os.makedirs(path, exist_ok=True)
+
+        with open(os.path.join(openclaw_dir, "openclaw.json"), "w") as f:
+            json.dump({"gateway": {"port": self.port}}, f)
+        # The fake gateway lives in this process, so our PID stands in for it
+        with open(os.path.join(openclaw_dir, "gateway.pid"), "w") as f:
+            f.write(str(os.getpid()))
+        with open(os.path.join(self.state_dir, "scenario.json"), "w") as f:
+            json.dump(scenario or {}, f)
+
+        self.cli = os.path.join(bin_dir, "openclaw")
+        with open(self.cli, "w") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{BENCH_DIR}/fake_openclaw.py" "$@"\n')
+        os.chmod(self.cli, 0o755)
+
+        write_gateway_state(self.state_dir, up=True)
+        self.gateway = FakeGateway(self.port, self.state_dir)
+
+    @property
+    def log_dir(self):
+        return os.path.join(self.home, ".openclaw", "logs")
+
+    def env(self):
+        return dict(os.environ, HOME=self.home, FAKE_OPENCLAW_DIR=self.state_dir)
+
+    def __enter__(self):
+        self.gateway.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.gateway.stop()
+
+
+def run_measured(cmd, env, stdout=subprocess.DEVNULL):
+    """Run a command to completion; return (wall_s, cpu_s, peak_rss_mb, returncode)."""
+    start_t = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env, stdout=stdout, stderr=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - start_t
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss_mb = usage.ru_maxrss / (1024 ** 2 if sys.platform == "darwin" else 1024)
+    return wall, usage.ru_utime + usage.ru_stime, rss_mb, proc.returncode
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def bench_probe(runs):
+    """Healthy watchdog run: spawn probe + port, process and WebSocket checks."""
+    with tempfile.TemporaryDirectory() as root, Sandbox(root) as sandbox:
+        env = sandbox.env()
+        walls, cpus = [], []
+        for _ in range(runs):
+            wall, cpu, _, code = run_measured([sys.executable, WATCHDOG], env)
+            if code != 0:
+                raise RuntimeError(f"watchdog exited {code} on a healthy gateway")
+            walls.append(wall)
+            cpus.append(cpu)
+        cli_cpus = [run_measured([sandbox.cli, "sessions", "spawn"], env)[1] for _ in range(runs)]
+
+    return {
+        "runs": runs,
+        "wall_ms_p50": percentile(walls, 50) * 1000,
+        "wall_ms_p95": percentile(walls, 95) * 1000,
+        "cpu_ms_mean": statistics.mean(cpus) * 1000,
+        "fake_cli_cpu_ms_mean": statistics.mean(cli_cpus) * 1000,
+        "watchdog_cpu_ms_mean": (statistics.mean(cpus) - statistics.mean(cli_cpus)) * 1000,
+    }
+
+
+class ScaledClock:
+    """Stand-in for the `time` module that shortens sleeps but reports virtual time."""
+
+    def __init__(self, scale):
+        self.scale = scale
+        self.skipped = 0.0
+
+    def time(self):
+        return time.time() + self.skipped
+
+    def sleep(self, seconds):
+        time.sleep(seconds * self.scale)
+        self.skipped += seconds * (1 - self.scale)
+
+
+def load_watchdog(home):
+    """Import a fresh copy of watchdog.py bound to the sandbox $HOME."""
+    os.environ["HOME"] = home
+    spec = importlib.util.spec_from_file_location(f"watchdog_bench_{time.monotonic_ns()}", WATCHDOG)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def bench_recovery(failure, scale, recover_after):
+    """Take the gateway down and time the watchdog's detection and recovery."""
+    # The fake gateway runs on real time, so its recovery delay is scaled like the sleeps
+    scenario = {"down_stderr": FAILURE_STDERR[failure], "recover_after": recover_after * scale}
+    saved_env = {k: os.environ.get(k) for k in ("HOME", "FAKE_OPENCLAW_DIR")}
+    with tempfile.TemporaryDirectory() as root, Sandbox(root, scenario) as sandbox:
+        try:
+            os.environ["FAKE_OPENCLAW_DIR"] = sandbox.state_dir
+            watchdog = load_watchdog(sandbox.home)
+            clock = ScaledClock(scale)
+            watchdog.time = clock
+
+            marks = {}
+            original_restart = watchdog.restart_gateway
+
+            def timed_restart(failure_type=None):
+                marks["detected"] = clock.time()
+                marks["recovered"] = original_restart(failure_type)
+                return marks["recovered"]
+
+            watchdog.restart_gateway = timed_restart
+
+            write_gateway_state(sandbox.state_dir, up=False)
+            wall_start = time.perf_counter()
+            t0 = clock.time()
+            watchdog.main()
+            t_end = clock.time()
+            wall = time.perf_counter() - wall_start
+        finally:
+            for key, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+    return {
+        "failure": failure,
+        "time_scale": scale,
+        "detection_s": marks["detected"] - t0 if "detected" in marks else None,
+        "recovery_s": t_end - t0 if marks.get("recovered") else None,
+        "recovered": bool(marks.get("recovered")),
+        "wall_s": wall,
+    }
+
+
+def bench_fetcher(sizes, hours, cache_dir):
+    """health_fetcher.py over synthetic gateway.log files of each size.
+    
+    The cold run backfills the rollups from the whole log, so its rate is
+    over the file size. The warm run only reads the report window, so its
+    rate is over the lines the fetcher reports having analysed.
+    """
+    results = []
+    for size_text in sizes:
+        size = parse_size(size_text)
+        with tempfile.TemporaryDirectory() as root:
+            sandbox = Sandbox(root)
+            log_path = os.path.join(sandbox.log_dir, "gateway.log")
+            cached = os.path.join(cache_dir, f"gateway-{size_text}.log") if cache_dir else None
+            if cached and os.path.exists(cached):
+                os.symlink(cached, log_path)
+            else:
+                generate_log(cached or log_path, size, hours=hours)
+                if cached:
+                    os.symlink(cached, log_path)
+
+            cold_wall, cold_cpu, cold_rss, code = run_measured([sys.executable, FETCHER], sandbox.env())
+            report_path = os.path.join(root, "report.json")
+            with open(report_path, "w") as report:
+                wall, cpu, rss_mb, code = run_measured([sys.executable, FETCHER], sandbox.env(), stdout=report)
+            try:
+                with open(report_path) as report:
+                    lines = sum(json.load(report).get("data_sources", {}).values())
+            except ValueError:
+                lines = None
+        results.append({
+            "size": size_text,
+            "bytes": size,
+            "cold_wall_s": cold_wall,
+            "cold_cpu_s": cold_cpu,
+            "cold_mb_per_s": size / 1024 ** 2 / cold_wall if cold_wall else None,
+            "cold_peak_rss_mb": cold_rss,
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "lines_processed": lines,
+            "lines_per_s": lines / wall if lines is not None and wall else None,
+            "peak_rss_mb": rss_mb,
+            "exit_code": code,
+        })
+    return results
+
+
+def print_report(results):
+    if "probe" in results:
+        p = results["probe"]
+        print(f"probe     wall p50 {p['wall_ms_p50']:.1f}ms p95 {p['wall_ms_p95']:.1f}ms  "
+              f"cpu {p['cpu_ms_mean']:.1f}ms (fake CLI {p['fake_cli_cpu_ms_mean']:.1f}ms, "
+              f"watchdog {p['watchdog_cpu_ms_mean']:.1f}ms)  n={p['runs']}")
+    for r in results.get("recovery", []):
+        detection = f"{r['detection_s']:.1f}s" if r["detection_s"] is not None else "n/a"
+        recovery = f"{r['recovery_s']:.1f}s" if r["recovery_s"] is not None else "not recovered"
+        print(f"recovery  {r['failure']:<10} detection {detection}  recovery {recovery}  "
+              f"(wall {r['wall_s']:.1f}s @ time scale {r['time_scale']})")
+    for r in results.get("fetcher", []):
+        print(f"fetcher   {r['size']:>6}  cold wall {r['cold_wall_s']:.2f}s  {r['cold_mb_per_s']:.1f} MB/s  "
+              f"peak RSS {r['cold_peak_rss_mb']:.1f} MB")
+        lines_per_s = f"{r['lines_per_s']:.0f} lines/s" if r["lines_per_s"] is not None else "n/a"
+        print(f"fetcher   {r['size']:>6}  warm wall {r['wall_s']:.2f}s  {r['lines_processed']} lines, "
+              f"{lines_per_s}  peak RSS {r['peak_rss_mb']:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark OpenClaw Guardian")
+    parser.add_argument("--only", default="probe,recovery,fetcher",
+                        help="Comma-separated benchmarks to run")
+    parser.add_argument("--probe-runs", type=int, default=10)
+    parser.add_argument("--failures", default="CONNECTION",
+                        help=f"Failure classes to inject: {','.join(FAILURE_STDERR)}")
+    parser.add_argument("--time-scale", type=float, default=0.01,
+                        help="Multiplier applied to watchdog sleeps; latencies are reported unscaled")
+    parser.add_argument("--recover-after", type=float, default=10.0,
+                        help="Seconds (unscaled) the fake gateway takes to come back after a restart")
+    parser.add_argument("--log-sizes", default="1M,64M", help="Synthetic gateway.log sizes")
+    parser.add_argument("--log-hours", type=float, default=24, help="Time span of synthetic logs")
+    parser.add_argument("--cache-dir", help="Keep generated logs here for reuse across runs")
+    parser.add_argument("--json", help="Also write results as JSON to this path")
+    args = parser.parse_args()
+
+    only = set(args.only.split(","))
+    if args.cache_dir:
+        os.makedirs(args.cache_dir, exist_ok=True)
+
+    results = {}
+    if "probe" in only:
+        results["probe"] = bench_probe(args.probe_runs)
+    if "recovery" in only:
+        results["recovery"] = [
+            bench_recovery(failure, args.time_scale, args.recover_after)
+            for failure in args.failures.split(",")
+        ]
+    if "fetcher" in only:
+        results["fetcher"] = bench_fetcher(args.log_sizes.split(","), args.log_hours, args.cache_dir)
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
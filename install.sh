@@ -119,6 +119,13 @@ install_audit() {
     cp "$SCRIPT_DIR/layer2-audit/health_fetcher.py" "$SCRIPTS_DIR/"
     chmod +x "$SCRIPTS_DIR/health_fetcher.py"
     print_success "Installed health_fetcher.py"
+    
+    # Background snapshot refresh, so the skill's --cached reads stay cheap
+    sed -e "s|{{HOME}}|$HOME|g" \
+        -e "s|{{USER}}|$USER|g" \
+        "$SCRIPT_DIR/layer2-audit/com.openclaw.guardian.audit.plist" > "$LAUNCHAGENTS_DIR/com.openclaw.guardian.audit.plist"
+    launchctl load "$LAUNCHAGENTS_DIR/com.openclaw.guardian.audit.plist" 2>/dev/null || print_warning "Audit refresh already loaded"
+    print_success "Snapshot refresh scheduled (every 4 minutes)"
 }
 
 install_skill() {
@@ -211,6 +218,12 @@ verify_installation() {
         print_error "Day schedule not loaded"
     fi
     
+    if launchctl list | grep -q "com.openclaw.guardian.audit"; then
+        print_success "Snapshot refresh loaded"
+    else
+        print_error "Snapshot refresh not loaded"
+    fi
+    
     if launchctl list | grep -q "com.openclaw.guardian.night"; then
         print_success "Night schedule loaded"
     else
@@ -4,37 +4,152 @@ OpenClaw Watchdog V8 - Self-Healing Guardian
 External health probe with rolling backup recovery.
 """
 
-import subprocess
 import time
 import sys
 import datetime
 import os
-import json
-import shutil
 import fcntl
 import errno
-import socket
-import base64
+
+# subprocess, json, shutil, socket and base64 are imported where used: launchd
+# starts this script dozens of times a day and most runs never need them all.
 
 # Configuration
 # Configuration - Use expanduser for cross-system compatibility
 HOME = os.path.expanduser("~")
-OPENCLAW_BIN = os.path.join(HOME, ".npm-global", "bin", "openclaw")
 GUARDIAN_DIR = os.path.join(HOME, ".openclaw", "guardian")
+OPENCLAW_BIN_CACHE = os.path.join(GUARDIAN_DIR, "openclaw-bin.cache")
+OPENCLAW_BIN_CANDIDATES = [
+    os.path.join(HOME, ".npm-global", "bin", "openclaw"),
+    "/usr/local/bin/openclaw",
+    "/opt/homebrew/bin/openclaw",
+]
 LOG_FILE = os.path.join(GUARDIAN_DIR, "watchdog.log")
 STATE_FILE = os.path.join(GUARDIAN_DIR, "watchdog.state")
 AUDIT_FILE = os.path.join(GUARDIAN_DIR, "watchdog-audit.jsonl")
 PID_FILE = os.path.join(GUARDIAN_DIR, "watchdog.pid")
 CONFIG_FILE = os.path.join(HOME, ".openclaw", "openclaw.json")
 CONFIG_BACKUP_DIR = os.path.join(HOME, ".openclaw", "config-backups")
+GATEWAY_PID_FILES = [
+    os.path.join(HOME, ".openclaw", "gateway.pid"),
+    os.path.join(HOME, ".openclaw", "logs", "gateway.pid"),
+    os.path.join(HOME, ".openclaw", "run", "gateway.pid"),
+]
+GATEWAY_CMDLINE_PATTERN = rb"openclaw[- ]gateway"
+IS_LINUX = sys.platform.startswith("linux")
 MAX_CONSECUTIVE_RESTARTS = 3
 MAX_LOG_SIZE_BYTES = 10 * 1024 * 1024  # 10MB
+LOG_ROTATE_KEEP = 5  # Compressed generations: watchdog.log.1.gz (newest) .. .5.gz
 ROLLING_BACKUP_COUNT = 3
 
+# Recovery policy: candidate actions per failure class, judged by history
+RECOVERY_ACTIONS = {
+    "CONFIG_ERROR": ["restore_and_restart", "restart"],
+}
+DEFAULT_RECOVERY_ACTIONS = ["restart"]
+RECOVERY_HISTORY_SIZE = 20          # Outcomes kept per (failure class, action)
+RECOVERY_HISTORY_MAX_AGE_DAYS = 14  # Older outcomes are ignored, so skipped actions get re-tried
+RECOVERY_MIN_SAMPLES = 3            # Outcomes needed before an action is judged
+RECOVERY_MIN_SUCCESS_RATE = 0.34    # Below this an action "does not help"
+# Only failures a restart cannot fix may be skipped; the rest always restart
+SKIPPABLE_FAILURES = {"AUTH_ERROR"}
+RECOVERY_RETRY_HOURS = 6            # Even a skipped class gets one exploratory restart this often
+RECOVERY_VERIFY_TIMEOUT = 90        # Seconds after a restart before giving up on recovery
+RECOVERY_POLL_INTERVAL = 3          # Seconds between port polls while waiting for recovery
+
+# Resource sampling (Linux /proc) and preemptive restart thresholds
+RESOURCE_SAMPLE_COUNT = 96               # Ring buffer size (~1 day of daytime probes)
+RESOURCE_TREND_MIN_SAMPLES = 6           # Samples needed before judging a trend
+RESOURCE_TREND_MIN_SPAN_HOURS = 1.0      # ...spanning at least this long
+RESOURCE_RSS_GROWTH_MB_PER_HOUR = 50     # Sustained RSS growth considered a leak
+RESOURCE_RSS_MIN_MB = 512                # Ignore growth below this footprint
+RESOURCE_FD_GROWTH_PER_HOUR = 200        # Sustained FD growth considered a leak
+RESOURCE_FD_MIN = 1000                   # Ignore FD growth below this count
+RESOURCE_CPU_PINNED_PCT = 95             # CPU% that counts as a pinned event loop
+RESOURCE_CPU_PINNED_SAMPLES = 4          # Consecutive pinned samples before acting
+PREEMPTIVE_RESTART_DELAY_MINUTES = 30    # Notice given before a preemptive restart
+
 # Ensure PATH includes node location
 ENV_SETUP = "export PATH=$PATH:/usr/local/bin:/opt/homebrew/bin; "
 
 
+_openclaw_bin = None
+
+
+def openclaw_bin():
+    """Resolve the openclaw CLI path once, caching it in the guardian state dir.
+
+    The cached path is revalidated with a single access() check; candidates
+    are only probed again when it disappears.
+    """
+    global _openclaw_bin
+    if _openclaw_bin:
+        return _openclaw_bin
+
+    try:
+        with open(OPENCLAW_BIN_CACHE, "r") as f:
+            cached = f.read().strip()
+        if cached and os.access(cached, os.X_OK):
+            _openclaw_bin = cached
+            return _openclaw_bin
+    except OSError:
+        pass
+
+    import shutil
+    found = next((p for p in OPENCLAW_BIN_CANDIDATES if os.access(p, os.X_OK)), None)
+    found = found or shutil.which("openclaw")
+    if not found:
+        # Let the shell report "command not found" so classify_failure() catches it
+        return OPENCLAW_BIN_CANDIDATES[0]
+
+    try:
+        write_file_atomic(OPENCLAW_BIN_CACHE, found)
+    except OSError as e:
+        log(f"⚠️ Failed to cache openclaw path: {e}")
+    _openclaw_bin = found
+    return _openclaw_bin
+
+
+def forget_openclaw_bin():
+    """Drop the cached CLI path so the next run resolves it again."""
+    global _openclaw_bin
+    _openclaw_bin = None
+    try:
+        os.unlink(OPENCLAW_BIN_CACHE)
+    except OSError:
+        pass
+
+
+def write_file_atomic(path, data):
+    """Replace path with data via a temp file, so readers see the old or new content, never a mix."""
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def copy_file_atomic(src, dst):
+    """shutil.copy2 into a temp file, then rename over dst."""
+    import shutil
+    tmp_path = f"{dst}.tmp.{os.getpid()}"
+    shutil.copy2(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+def frame_audit_record(event):
+    """Encode an audit event as one `<length>:<crc32>:<json>` line.
+    
+    The length and checksum let readers tell a complete record from one
+    that is still being appended (or was torn by a crash).
+    """
+    import json
+    import zlib
+    payload = json.dumps(event, ensure_ascii=False).encode("utf-8")
+    return b"%d:%08x:%s\n" % (len(payload), zlib.crc32(payload), payload)
+
+
 def write_audit_event(event_type, status, details=None):
     """Write structured audit event for system-watchdog to consume."""
     event = {
@@ -44,8 +159,14 @@ def write_audit_event(event_type, status, details=None):
         "details": details or {}
     }
     try:
-        with open(AUDIT_FILE, "a") as f:
-            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        record = frame_audit_record(event)
+        fd = os.open(AUDIT_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            # Writers serialize on the file; readers never lock and just skip an incomplete tail
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            os.write(fd, record)
+        finally:
+            os.close(fd)
     except Exception as e:
         log(f"⚠️ Failed to write audit event: {e}")
 
@@ -67,12 +188,24 @@ def log(message):
 
 
 def _rotate_log():
-    """Rotate log file: watchdog.log -> watchdog.log.1"""
+    """Rotate log file: watchdog.log -> watchdog.log.1.gz, shifting older generations up."""
+    import gzip
+    import shutil
     try:
-        backup = f"{LOG_FILE}.1"
-        if os.path.exists(backup):
-            os.remove(backup)
-        shutil.move(LOG_FILE, backup)
+        oldest = f"{LOG_FILE}.{LOG_ROTATE_KEEP}.gz"
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for n in range(LOG_ROTATE_KEEP - 1, 0, -1):
+            if os.path.exists(f"{LOG_FILE}.{n}.gz"):
+                os.replace(f"{LOG_FILE}.{n}.gz", f"{LOG_FILE}.{n + 1}.gz")
+        
+        # Rename first so new messages go to a fresh file while we compress
+        staged = f"{LOG_FILE}.1"
+        os.replace(LOG_FILE, staged)
+        with open(staged, "rb") as src, gzip.open(f"{staged}.gz.tmp", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(f"{staged}.gz.tmp", f"{staged}.gz")
+        os.remove(staged)
         log("📝 Log file rotated")
     except Exception as e:
         # If rotation fails, truncate current log
@@ -119,7 +252,7 @@ def notify(message, level="info"):
     
     # Strategy 1: Try openclaw CLI
     try:
-        cmd = f'{OPENCLAW_BIN} message send --target "1467890964843597988" --message "{full_msg}"'
+        cmd = f'{openclaw_bin()} message send --target "1467890964843597988" --message "{full_msg}"'
         result = run_command(cmd, timeout=10)
         if result and result.returncode == 0:
             return
@@ -128,6 +261,7 @@ def notify(message, level="info"):
     
     # Strategy 2: macOS notification center (osascript)
     try:
+        import subprocess
         title = "OpenClaw Watchdog"
         script = f'display notification "{message}" with title "{title}" sound name "Glass"'
         subprocess.run(["osascript", "-e", script], timeout=5, capture_output=True)
@@ -138,29 +272,96 @@ def notify(message, level="info"):
     log(f"Notification (delivered to log only): {message}")
 
 
-def get_restart_count():
+def load_state():
+    """Load watchdog.state as a dict (empty if missing or unreadable)."""
     if not os.path.exists(STATE_FILE):
-        return 0
+        return {}
+    import json
     try:
         with open(STATE_FILE, "r") as f:
             data = json.load(f)
-            return data.get("restart_count", 0)
+        return data if isinstance(data, dict) else {}
     except:
-        return 0
+        return {}
 
 
-def set_restart_count(count):
+def save_state(state):
+    """Persist watchdog.state, stamping the update time."""
+    import json
+    state["last_update"] = datetime.datetime.now().isoformat()
     try:
-        with open(STATE_FILE, "w") as f:
-            json.dump({
-                "restart_count": count,
-                "last_update": datetime.datetime.now().isoformat()
-            }, f)
+        write_file_atomic(STATE_FILE, json.dumps(state))
     except Exception as e:
         log(f"⚠️ Failed to write state file: {e}")
 
 
+def get_restart_count():
+    return load_state().get("restart_count", 0)
+
+
+def set_restart_count(count):
+    state = load_state()
+    state["restart_count"] = count
+    save_state(state)
+
+
+def _recent_outcomes(outcomes):
+    """Drop outcomes older than the history horizon."""
+    horizon = time.time() - RECOVERY_HISTORY_MAX_AGE_DAYS * 86400
+    return [o for o in outcomes if o[0] >= horizon]
+
+
+def record_recovery_outcome(failure_type, action, recovered, seconds=None):
+    """Append a recovery outcome [ts, recovered, time_to_healthy] to the state store."""
+    state = load_state()
+    stats = state.setdefault("recovery_stats", {})
+    outcomes = stats.setdefault(failure_type or "UNKNOWN", {}).setdefault(action, [])
+    outcomes.append([
+        int(time.time()),
+        bool(recovered),
+        round(seconds, 1) if seconds is not None else None,
+    ])
+    del outcomes[:-RECOVERY_HISTORY_SIZE]
+    save_state(state)
+
+
+def choose_recovery_action(failure_type):
+    """Pick the recovery action for a failure class from historical outcomes.
+
+    Actions with too few samples are tried first (in RECOVERY_ACTIONS order).
+    Once every candidate is sampled, the one with the lowest mean time to
+    healthy wins. If none recovers often enough, a SKIPPABLE_FAILURES class
+    returns "skip" unless its last attempt is RECOVERY_RETRY_HOURS old;
+    any other class still gets its first candidate.
+    """
+    history = load_state().get("recovery_stats", {}).get(failure_type or "UNKNOWN", {})
+    candidates = RECOVERY_ACTIONS.get(failure_type, DEFAULT_RECOVERY_ACTIONS)
+
+    best_action, best_time = None, None
+    last_attempt = 0
+    for action in candidates:
+        outcomes = _recent_outcomes(history.get(action, []))
+        last_attempt = max([last_attempt] + [o[0] for o in outcomes])
+        if len(outcomes) < RECOVERY_MIN_SAMPLES:
+            return action, f"exploring, {len(outcomes)}/{RECOVERY_MIN_SAMPLES} samples"
+        times = [o[2] for o in outcomes if o[1] and o[2] is not None]
+        if len(times) / len(outcomes) < RECOVERY_MIN_SUCCESS_RATE:
+            continue
+        mean_time = sum(times) / len(times)
+        if best_time is None or mean_time < best_time:
+            best_action, best_time = action, mean_time
+
+    if best_action is None:
+        if failure_type not in SKIPPABLE_FAILURES:
+            return candidates[0], "restarts rarely help, but nothing else can fix this"
+        if time.time() - last_attempt >= RECOVERY_RETRY_HOURS * 3600:
+            return candidates[0], f"exploratory retry, none in {RECOVERY_RETRY_HOURS}h"
+        return "skip", f"restarts have not helped {failure_type} recently"
+    return best_action, f"best mean recovery {best_time:.0f}s"
+
+
 def run_command(cmd, timeout=30):
+    import subprocess
     try:
         full_cmd = ENV_SETUP + cmd
         result = subprocess.run(
@@ -178,6 +379,7 @@ def run_command(cmd, timeout=30):
 
 def is_config_valid():
     """Check if openclaw.json is valid JSON."""
+    import json
     try:
         with open(CONFIG_FILE, "r") as f:
             json.load(f)
@@ -199,6 +401,7 @@ def get_config_hash():
 
 def get_gateway_port(default_port=18789):
     """Read gateway port from openclaw.json, fallback to default."""
+    import json
     try:
         with open(CONFIG_FILE, "r") as f:
             data = json.load(f)
@@ -209,24 +412,21 @@ def get_gateway_port(default_port=18789):
         return default_port
 
 
-def check_gateway_port(port, timeout=2):
+def check_gateway_port(port, timeout=2, quiet=False):
     """Verify gateway port is accepting TCP connections."""
+    import socket
     try:
         with socket.create_connection(("127.0.0.1", port), timeout=timeout):
             return True
     except Exception as e:
-        log(f"⚠️ Gateway port check failed ({port}): {e}")
+        if not quiet:
+            log(f"⚠️ Gateway port check failed ({port}): {e}")
         return False
 
 
 def read_pid_from_file():
     """Try to read gateway PID from common pid file locations."""
-    candidates = [
-        os.path.expanduser("~/.openclaw/gateway.pid"),
-        os.path.expanduser("~/.openclaw/logs/gateway.pid"),
-        os.path.expanduser("~/.openclaw/run/gateway.pid"),
-    ]
-    for path in candidates:
+    for path in GATEWAY_PID_FILES:
         if os.path.exists(path):
             try:
                 with open(path, "r") as f:
@@ -238,39 +438,162 @@ def read_pid_from_file():
     return None
 
 
-def check_process_alive():
-    """Check gateway process existence via pid file or pgrep."""
-    pid = read_pid_from_file()
-    if pid:
+def read_proc_stat(pid):
+    """Return (cpu_ticks, start_time) for a PID from /proc/<pid>/stat, or None."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            raw = f.read()
+    except OSError:
+        return None
+    # comm may contain spaces/parentheses; fields resume after the last ')'
+    fields = raw[raw.rindex(b")") + 2:].split()
+    utime, stime, start_time = int(fields[11]), int(fields[12]), int(fields[19])
+    return utime + stime, start_time
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except PermissionError:
+        return True  # Exists, owned by someone else
+    except OSError:
+        return False
+
+
+def _listening_socket_inodes(port):
+    """Inodes of sockets in LISTEN state on a local port, from /proc/net/tcp{,6}."""
+    inodes = set()
+    for path in ("/proc/net/tcp", "/proc/net/tcp6"):
         try:
-            os.kill(pid, 0)
-            return True
-        except Exception as e:
-            log(f"⚠️ Gateway PID not alive ({pid}): {e}")
-            return False
+            with open(path, "r") as f:
+                next(f)  # Header
+                for line in f:
+                    fields = line.split()
+                    local, st, inode = fields[1], fields[3], fields[9]
+                    if st == "0A" and int(local.rsplit(":", 1)[1], 16) == port:
+                        inodes.add(inode)
+        except (OSError, StopIteration, IndexError, ValueError):
+            continue
+    return inodes
+
+
+def _find_socket_owner(inodes):
+    """PID holding one of the given socket inodes open, via /proc/*/fd."""
+    targets = {f"socket:[{inode}]" for inode in inodes}
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        try:
+            for fd in os.scandir(f"/proc/{entry.name}/fd"):
+                if os.readlink(fd.path) in targets:
+                    return int(entry.name)
+        except OSError:
+            continue  # Exited, or not ours to inspect
+    return None
+
 
+def _find_gateway_by_cmdline():
+    """One-off /proc scan for a process whose command line looks like the gateway."""
+    import re
+    pattern = re.compile(GATEWAY_CMDLINE_PATTERN)
+    own_pid = os.getpid()
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit() or int(entry.name) == own_pid:
+            continue
+        try:
+            with open(f"/proc/{entry.name}/cmdline", "rb") as f:
+                cmdline = f.read().replace(b"\0", b" ")
+        except OSError:
+            continue
+        if pattern.search(cmdline):
+            return int(entry.name)
+    return None
+
+
+def _find_gateway_by_pgrep():
+    """pgrep fallback for platforms without /proc."""
+    import subprocess
     try:
         result = subprocess.run(
-            ["pgrep", "-f", "openclaw[- ]gateway"],
+            ["pgrep", "-f", GATEWAY_CMDLINE_PATTERN.decode()],
             timeout=2,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
         )
         if result.returncode == 0 and result.stdout.strip():
-            return True
-        log("⚠️ pgrep found no gateway process")
-        return False
+            return int(result.stdout.split()[0])
     except FileNotFoundError:
         log("⚠️ pgrep not available for process check")
-        return False
     except Exception as e:
         log(f"⚠️ pgrep failed: {e}")
-        return False
+    return None
+
+
+def discover_gateway_pid(port=None):
+    """Full PID discovery: PID file, listening socket owner, then process scan.
+    
+    Returns (pid, source) or (None, None).
+    """
+    pid = read_pid_from_file()
+    if pid and pid_alive(pid):
+        return pid, "pidfile"
+    
+    if not IS_LINUX:
+        pid = _find_gateway_by_pgrep()
+        return (pid, "pgrep") if pid else (None, None)
+    
+    if port:
+        inodes = _listening_socket_inodes(port)
+        pid = _find_socket_owner(inodes) if inodes else None
+        if pid:
+            return pid, "socket"
+    
+    pid = _find_gateway_by_cmdline()
+    return (pid, "cmdline") if pid else (None, None)
+
+
+def _cached_pid_valid(entry):
+    """Cheap revalidation: same start time on Linux (catches PID reuse), else kill(0)."""
+    if IS_LINUX:
+        stat = read_proc_stat(entry["pid"])
+        return stat is not None and stat[1] == entry.get("start")
+    return pid_alive(entry["pid"])
+
+
+def resolve_gateway_pid(port=None):
+    """Gateway PID from the cached discovery entry, rediscovering only when stale."""
+    state = load_state()
+    cached = state.get("gateway_pid")
+    if cached and _cached_pid_valid(cached):
+        return cached["pid"]
+    
+    pid, source = discover_gateway_pid(port)
+    if pid:
+        stat = read_proc_stat(pid) if IS_LINUX else None
+        state["gateway_pid"] = {"pid": pid, "start": stat[1] if stat else None, "source": source}
+        log(f"🔎 Gateway PID {pid} discovered via {source}")
+        save_state(state)
+    elif cached:
+        state.pop("gateway_pid")
+        save_state(state)
+    return pid
+
+
+def check_process_alive(port=None):
+    """Check gateway process existence via the cached PID discovery index."""
+    if resolve_gateway_pid(port):
+        return True
+    log("⚠️ No gateway process found (pid file, socket owner, process scan)")
+    return False
 
 
 def check_websocket_health(port, timeout=3):
     """Attempt a lightweight WebSocket handshake to /health."""
+    import base64
+    import socket
+
     key = os.urandom(16)
     ws_key = base64.b64encode(key).decode("ascii")
     request = (
@@ -301,7 +624,7 @@ def verify_gateway_health():
     """Secondary validation to avoid false positives."""
     port = get_gateway_port()
     port_ok = check_gateway_port(port)
-    process_ok = check_process_alive()
+    process_ok = check_process_alive(port)
     ws_ok = check_websocket_health(port) if port_ok else False
 
     log(
@@ -335,20 +658,21 @@ def backup_known_good():
         v1 = os.path.join(CONFIG_BACKUP_DIR, "openclaw.json.v1")
         current = os.path.join(CONFIG_BACKUP_DIR, "openclaw.json.current")
         
-        # Shift versions
+        # Shift versions (renames within one directory are atomic); current is
+        # copied rather than moved so a concurrent restore always finds it
         if os.path.exists(v2):
-            shutil.move(v2, v3)
+            os.replace(v2, v3)
         if os.path.exists(v1):
-            shutil.move(v1, v2)
+            os.replace(v1, v2)
         if os.path.exists(current):
-            shutil.move(current, v1)
+            copy_file_atomic(current, v1)
         
         # Save current
-        shutil.copy2(CONFIG_FILE, current)
+        copy_file_atomic(CONFIG_FILE, current)
         
         # Also update legacy single-file location for compatibility
         legacy = CONFIG_FILE + ".known-good"
-        shutil.copy2(CONFIG_FILE, legacy)
+        copy_file_atomic(CONFIG_FILE, legacy)
         
         config_hash = get_config_hash()
         log(f"💾 Config backed up (hash: {config_hash})")
@@ -374,9 +698,10 @@ def restore_known_good(version="current"):
         # Backup current (corrupted) config for forensics
         if os.path.exists(CONFIG_FILE):
             corrupted = os.path.join(CONFIG_BACKUP_DIR, "openclaw.json.corrupted")
-            shutil.copy2(CONFIG_FILE, corrupted)
+            copy_file_atomic(CONFIG_FILE, corrupted)
         
-        shutil.copy2(backup_path, CONFIG_FILE)
+        # The gateway may read the config at any moment; swap it in whole
+        copy_file_atomic(backup_path, CONFIG_FILE)
         notify(f"Config restored from {version} backup (corruption detected)", level="warning")
         write_audit_event("config_recovery", "success", {
             "restored_from": version,
@@ -412,7 +737,7 @@ def classify_failure(stderr, returncode):
 
 def check_health_spawn():
     """Probe Gateway health via sessions spawn."""
-    cmd = f'{OPENCLAW_BIN} sessions spawn --task "Say OK" --agentId main --timeoutSeconds 25'
+    cmd = f'{openclaw_bin()} sessions spawn --task "Say OK" --agentId main --timeoutSeconds 25'
     
     start_t = time.time()
     result = run_command(cmd, timeout=35)
@@ -426,6 +751,7 @@ def check_health_spawn():
     
     if failure_type == "CLI_NOT_FOUND":
         log(f"{failure_msg}. Aborting watchdog.")
+        forget_openclaw_bin()
         sys.exit(1)
     
     if result.returncode == 0:
@@ -442,8 +768,34 @@ def check_health_spawn():
         return False, failure_type, failure_msg
 
 
+def restore_config_from_backups():
+    """Restore config from the newest usable backup (current, v1, v2, v3)."""
+    for version in ["current", "v1", "v2", "v3"]:
+        if restore_known_good(version):
+            log(f"🔧 Config recovered from {version} backup.")
+            set_restart_count(0)  # Reset - different failure mode
+            return True
+    log("⛔ Config recovery failed from all backups.")
+    return False
+
+
+def wait_for_recovery(start_t):
+    """Poll until the gateway is healthy or RECOVERY_VERIFY_TIMEOUT passes.
+    
+    The port is polled cheaply; the spawn probe only runs once it accepts
+    connections. Returns (healthy, seconds since start_t).
+    """
+    port = get_gateway_port()
+    deadline = start_t + RECOVERY_VERIFY_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(RECOVERY_POLL_INTERVAL)
+        if check_gateway_port(port, quiet=True) and check_health_spawn()[0]:
+            return True, time.time() - start_t
+    return False, time.time() - start_t
+
+
 def restart_gateway(failure_type=None):
-    """Restart Gateway with config recovery if needed."""
+    """Restart Gateway using the recovery action that history favours for this failure class."""
     count = get_restart_count()
     
     if count >= MAX_CONSECUTIVE_RESTARTS:
@@ -452,21 +804,26 @@ def restart_gateway(failure_type=None):
         notify(msg, level="critical")
         return False
     
-    # Check and recover config if corrupted
-    if not is_config_valid() or failure_type == "CONFIG_ERROR":
-        log("🔴 Config file is corrupt! Attempting recovery...")
-        if restore_known_good("current"):
-            log("🔧 Config recovered from current backup. Proceeding with restart.")
-            set_restart_count(0)  # Reset - different failure mode
-        else:
-            # Try older versions
-            for version in ["v1", "v2", "v3"]:
-                if restore_known_good(version):
-                    log(f"🔧 Config recovered from {version} backup.")
-                    set_restart_count(0)
-                    break
-            else:
-                log("⛔ Config recovery failed from all backups.")
+    # A corrupt config always needs restoring, whatever the history says
+    if not is_config_valid():
+        action, reason = "restore_and_restart", "config file invalid"
+    else:
+        action, reason = choose_recovery_action(failure_type)
+    log(f"🧭 Recovery policy for {failure_type or 'UNKNOWN'}: {action} ({reason})")
+    
+    if action == "skip":
+        msg = f"Gateway unhealthy ({failure_type}) but restart skipped: {reason}. Manual check advised."
+        log(f"⏸️ {msg}")
+        notify(msg, level="warning")
+        write_audit_event("gateway_restart", "skipped", {
+            "reason": failure_type,
+            "policy": reason
+        })
+        return False
+    
+    if action == "restore_and_restart":
+        log("🔴 Restoring config before restart...")
+        restore_config_from_backups()
     
     count = get_restart_count()  # Re-check after potential reset
     msg = f"Gateway unresponsive ({failure_type or 'UNKNOWN'}). Restarting ({count + 1}/{MAX_CONSECUTIVE_RESTARTS})..."
@@ -475,34 +832,180 @@ def restart_gateway(failure_type=None):
     
     write_audit_event("gateway_restart", "initiated", {
         "reason": failure_type,
+        "action": action,
         "attempt": count + 1,
         "max_attempts": MAX_CONSECUTIVE_RESTARTS
     })
     
-    result = run_command(f'{OPENCLAW_BIN} gateway restart', timeout=60)
+    start_t = time.time()
+    result = run_command(f'{openclaw_bin()} gateway restart', timeout=60)
     
     if result and result.returncode == 0:
         set_restart_count(count + 1)
         log("🔄 Restart command issued. Waiting for recovery...")
         
-        # Verify recovery after restart
-        time.sleep(30)
-        success, _, _ = check_health_spawn()
+        success, time_to_healthy = wait_for_recovery(start_t)
+        record_recovery_outcome(failure_type, action, success, time_to_healthy if success else None)
         if success:
             notify("Gateway recovery verified ✅", level="info")
-            write_audit_event("gateway_restart", "success", {"verified": True})
+            write_audit_event("gateway_restart", "success", {
+                "verified": True,
+                "action": action,
+                "time_to_healthy_s": round(time_to_healthy, 1)
+            })
             return True
         else:
             log("⚠️ Restart issued but health check still failing")
-            write_audit_event("gateway_restart", "failed", {"verified": False})
+            write_audit_event("gateway_restart", "failed", {"verified": False, "action": action})
             return False
     else:
         error_msg = result.stderr if result else 'Unknown error'
+        # A failing CLI says nothing about whether the action helps this class,
+        # so it is not recorded as an outcome
         log(f"⛔ Restart command failed: {error_msg}")
-        write_audit_event("gateway_restart", "failed", {"error": error_msg[:200]})
+        write_audit_event("gateway_restart", "failed", {
+            "error": error_msg[:200],
+            "action": action,
+            "command_failed": True
+        })
         return False
 
 
+def sample_process_resources(pid):
+    """Sample RSS, CPU ticks, threads and open FDs of a process from /proc (no subprocess)."""
+    stat = read_proc_stat(pid)
+    if stat is None:
+        return None
+    
+    sample = {
+        "ts": round(time.time(), 1),
+        "pid": pid,
+        "start": stat[1],
+        "cpu_ticks": stat[0],
+        "rss_mb": None,
+        "threads": None,
+        "fds": None,
+    }
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    sample["rss_mb"] = round(int(line.split()[1]) / 1024, 1)
+                elif line.startswith("Threads:"):
+                    sample["threads"] = int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    try:
+        sample["fds"] = len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        pass  # Not our process, or /proc/<pid>/fd not readable
+    return sample
+
+
+def _slope_per_hour(samples, key):
+    """Least-squares slope of a sample field, in units per hour."""
+    points = [(s["ts"], s[key]) for s in samples if s.get(key) is not None]
+    if len(points) < 2:
+        return 0.0
+    mean_t = sum(t for t, _ in points) / len(points)
+    mean_v = sum(v for _, v in points) / len(points)
+    var_t = sum((t - mean_t) ** 2 for t, _ in points)
+    if not var_t:
+        return 0.0
+    cov = sum((t - mean_t) * (v - mean_v) for t, v in points)
+    return cov / var_t * 3600
+
+
+def detect_resource_trend(samples):
+    """Return a reason string if samples show a leak or pinned CPU, else None."""
+    if len(samples) < RESOURCE_TREND_MIN_SAMPLES:
+        return None
+    
+    recent = samples[-RESOURCE_CPU_PINNED_SAMPLES:]
+    if (len(recent) == RESOURCE_CPU_PINNED_SAMPLES
+            and all((s.get("cpu_pct") or 0) >= RESOURCE_CPU_PINNED_PCT for s in recent)):
+        return f"CPU pinned at >= {RESOURCE_CPU_PINNED_PCT}% for {len(recent)} samples"
+    
+    span_hours = (samples[-1]["ts"] - samples[0]["ts"]) / 3600
+    if span_hours < RESOURCE_TREND_MIN_SPAN_HOURS:
+        return None
+    
+    rss_slope = _slope_per_hour(samples, "rss_mb")
+    rss_now = samples[-1].get("rss_mb") or 0
+    if rss_slope >= RESOURCE_RSS_GROWTH_MB_PER_HOUR and rss_now >= RESOURCE_RSS_MIN_MB:
+        return f"RSS growing {rss_slope:.0f} MB/h (now {rss_now:.0f} MB)"
+    
+    fd_slope = _slope_per_hour(samples, "fds")
+    fds_now = samples[-1].get("fds") or 0
+    if fd_slope >= RESOURCE_FD_GROWTH_PER_HOUR and fds_now >= RESOURCE_FD_MIN:
+        return f"FD count growing {fd_slope:.0f}/h (now {fds_now})"
+    
+    return None
+
+
+def monitor_gateway_resources():
+    """Sample gateway resources after a healthy probe and manage preemptive restarts.
+    
+    A detected trend schedules a restart PREEMPTIVE_RESTART_DELAY_MINUTES out;
+    the first healthy probe after that performs it through restart_gateway(),
+    unless the trend has cleared in the meantime.
+    """
+    # resolve_gateway_pid() may save a rediscovered PID; load state after it
+    # so saving the samples doesn't write the stale entry back
+    pid = resolve_gateway_pid(get_gateway_port())
+    sample = sample_process_resources(pid) if pid else None
+    if sample is None:
+        return  # No /proc (macOS) or PID unknown
+    
+    state = load_state()
+    samples = state.get("resource_samples", [])
+    if samples and (samples[-1]["pid"], samples[-1]["start"]) != (pid, sample["start"]):
+        samples = []  # Gateway restarted: trends start over
+    if samples:
+        elapsed = sample["ts"] - samples[-1]["ts"]
+        if elapsed > 0:
+            ticks = os.sysconf("SC_CLK_TCK")
+            cpu_s = (sample["cpu_ticks"] - samples[-1]["cpu_ticks"]) / ticks
+            sample["cpu_pct"] = round(cpu_s / elapsed * 100, 1)
+    samples.append(sample)
+    del samples[:-RESOURCE_SAMPLE_COUNT]
+    state["resource_samples"] = samples
+    
+    log(
+        f"📈 Gateway resources: pid={pid} rss={sample['rss_mb']}MB "
+        f"cpu={sample.get('cpu_pct', '-')}% threads={sample['threads']} fds={sample['fds']}"
+    )
+    
+    trend = detect_resource_trend(samples)
+    scheduled = state.get("scheduled_restart")
+    now = time.time()
+    
+    if scheduled and not trend:
+        log(f"✅ Resource trend cleared, cancelling scheduled restart ({scheduled['reason']})")
+        write_audit_event("preemptive_restart", "cancelled", {"reason": scheduled["reason"]})
+        state.pop("scheduled_restart")
+        save_state(state)
+    elif trend and not scheduled:
+        due = now + PREEMPTIVE_RESTART_DELAY_MINUTES * 60
+        state["scheduled_restart"] = {"reason": trend, "due": due}
+        save_state(state)
+        msg = f"Gateway resource trend: {trend}. Preemptive restart in {PREEMPTIVE_RESTART_DELAY_MINUTES} min."
+        log(f"⏳ {msg}")
+        notify(msg, level="warning")
+        write_audit_event("preemptive_restart", "scheduled", {
+            "reason": trend,
+            "due": datetime.datetime.fromtimestamp(due).isoformat()
+        })
+    elif trend and now >= scheduled["due"]:
+        state.pop("scheduled_restart")
+        save_state(state)
+        log(f"🔁 Performing scheduled preemptive restart: {trend}")
+        write_audit_event("preemptive_restart", "executing", {"reason": trend})
+        restart_gateway("RESOURCE_TREND")
+    else:
+        save_state(state)
+
+
 def heartbeat_attempt(attempt_num, wait_time):
     """Single heartbeat attempt with detailed logging."""
     log(f"Attempt {attempt_num}: Probing Gateway...")
@@ -527,14 +1030,17 @@ def main():
     try:
         # Attempt 1
         if heartbeat_attempt(1, 30):
+            monitor_gateway_resources()
             return
         
         # Attempt 2
         if heartbeat_attempt(2, 30):
+            monitor_gateway_resources()
             return
         
         # Attempt 3 (final)
         if heartbeat_attempt(3, 30):
+            monitor_gateway_resources()
             return
         
         # All attempts failed - trigger recovery
@@ -6,24 +6,80 @@ Reads gateway.log and gateway.err.log to capture comprehensive system health.
 import json
 import os
 import re
-import subprocess
+import time
 from datetime import datetime, timedelta, timezone
-from collections import defaultdict
 
 HOME = os.path.expanduser("~")
-OPENCLAW_BIN = os.path.join(HOME, ".npm-global", "bin", "openclaw")
-# Support alternative install locations
-if not os.path.exists(OPENCLAW_BIN):
-    alternative_paths = [
-        "/usr/local/bin/openclaw",
-        "/opt/homebrew/bin/openclaw",
-    ]
-    for alt_path in alternative_paths:
-        if os.path.exists(alt_path):
-            OPENCLAW_BIN = alt_path
-            break
-
 LOG_DIR = os.path.join(HOME, ".openclaw", "logs")
+GATEWAY_LOG = os.path.join(LOG_DIR, "gateway.log")
+ERROR_LOG = os.path.join(LOG_DIR, "gateway.err.log")
+GUARDIAN_DIR = os.path.join(HOME, ".openclaw", "guardian")
+AUDIT_FILE = os.path.join(GUARDIAN_DIR, "watchdog-audit.jsonl")
+CRON_JOBS_FILE = os.path.join(HOME, ".openclaw", "cron", "jobs.json")
+# Audit records are `<length>:<crc32>:<json>` lines (older files hold plain JSON lines)
+AUDIT_FRAME_PATTERN = r"^(\d+):([0-9a-f]{8}):"
+
+# Cron run history and alert thresholds
+CRON_HISTORY_FILE = os.path.join(GUARDIAN_DIR, "cron-history.json")
+CRON_HISTORY_SIZE = 50                    # Runs kept per job
+CRON_OVERDUE_GRACE_MS = 5 * 60 * 1000     # Minimum lateness before a job counts as overdue
+CRON_DURATION_REGRESSION_FACTOR = 2.0     # Last run vs. median of earlier runs
+CRON_DURATION_MIN_SAMPLES = 3             # Earlier runs needed to judge a regression
+CRON_FAILURE_STREAK_ALERT = 2             # Consecutive failed runs before alerting
+CRON_OK_STATUSES = ("ok", "success", "skipped")
+
+# Compact report payload (--compact) for the audit agent prompt
+REPORT_BUDGET_BYTES = 4096
+LAST_REPORT_FILE = os.path.join(GUARDIAN_DIR, "last-report.json")
+ERROR_GROUP_LIMIT = 10
+# Sections dropped from the payload when identical to the previous report
+REPORT_DIFF_SECTIONS = [
+    "gateway", "llm_health", "llm_anomalies", "cron_jobs", "cron_alerts", "watchdog_self_healing",
+]
+# Lists trimmed (lowest ranked items first) until the payload fits, in order
+REPORT_TRIM_ORDER = [
+    ("llm_health", "model_switches"),
+    ("gateway", "restart_details"),
+    ("llm_health", "cooldown_events"),
+    ("cron_jobs",),
+    ("llm_health", "error_groups"),
+    ("watchdog_self_healing", "gateway_restarts"),
+    ("watchdog_self_healing", "config_recoveries"),
+    ("watchdog_self_healing", "preemptive_restarts"),
+    ("cron_alerts",),
+    ("llm_anomalies", "degraded"),
+]
+# Whole entries dropped, in order, when trimming lists alone can't meet the budget
+REPORT_DROP_ORDER = [
+    ("data_sources",),
+    ("llm_health", "recent_failover_errors"),
+    ("llm_health", "profiles_timed_out"),
+    ("llm_anomalies", "scores"),
+    ("cron_jobs",),
+    ("gateway",),
+    ("watchdog_self_healing",),
+    ("llm_health",),
+    ("cron_alerts",),
+    ("llm_anomalies",),
+]
+
+# Rotated log siblings: gateway.log.1, gateway.log.2.gz, gateway.log.3.zst, ...
+LOG_ARCHIVE_SUFFIXES = (".gz", ".zst")
+LOG_SEEK_MIN_SPAN = 64 * 1024   # Binary search stops once the window start is this close
+
+# Pre-aggregated rollups behind `health_fetcher.py query`
+ROLLUP_DB = os.path.join(GUARDIAN_DIR, "rollups.db")
+ROLLUP_RESOLUTIONS = {"minute": 60, "hour": 3600, "day": 86400}
+ROLLUP_RETENTION_DAYS = {"minute": 2, "hour": 90, "day": 1095}
+QUERY_GROUP_FIELDS = ("source", "metric", "provider", "subject", "minute", "hour", "day")
+ROLLUP_SCHEMA_VERSION = 4        # Older databases are migrated in place by open_rollup_db()
+ROLLUP_CHUNK_LINES = 20000       # Lines folded per transaction (bounds memory and write-lock time)
+ROLLUP_LOCK_FILE = ROLLUP_DB + ".lock"
+ROLLUP_HEAD_BYTES = 256          # First-line fingerprint that finds a log again after compression
+
+# Materialized snapshot served by --cached
+SNAPSHOT_FILE = os.path.join(GUARDIAN_DIR, "health-snapshot.json")
+SNAPSHOT_TTL_SECONDS = 300   # Refreshed every 4 min by com.openclaw.guardian.audit.plist
 
 # LLM Error patterns for structured analysis
 LLM_PATTERNS = {
@@ -35,41 +91,203 @@ LLM_PATTERNS = {
     "failover_error": r"FailoverError.*LLM",
     "profile_timeout": r"Profile (\S+).*timed out",
 }
+# Lowercase literals, one of which every LLM_PATTERNS match contains (cheap prefilter)
+LLM_PREFILTER_KEYWORDS = (
+    "auth profile", "authentication_error", "invalid bearer token", "401",
+    "rate limit", "429", "quota exceeded", "you exceeded", "timed out", "timeout", "failover",
+)
 
+# Gateway lifecycle patterns (gateway.log)
+GATEWAY_RESTART_PATTERNS = [r"SIGUSR1", r"Starting gateway", r"Restarting"]
+GATEWAY_FALLBACK_PATTERNS = [r"fallback", r"switching to"]
+GATEWAY_MODEL_PATTERNS = [r"agent model:\s+(\S+)", r"using model:\s+(\S+)"]
 
-def read_log_file_tail(log_path, max_bytes=512*1024, hours=2):
-    """Read recent lines from a log file within time window."""
-    if not os.path.exists(log_path):
+# Best-effort provider attribution for error lines that don't name one
+PROVIDER_HINT_PATTERN = r"(?:provider|profile)[=:\s]+\"?([A-Za-z][\w-]*)"
+
+# Rolling per-provider error baselines (EWMA per hour of day)
+LLM_BASELINE_FILE = os.path.join(GUARDIAN_DIR, "llm-baselines.json")
+ANOMALY_EWMA_ALPHA = 0.1          # Weight of the newest hour in the baseline
+ANOMALY_MIN_SAMPLES = 5           # Hours of history before a baseline is trusted
+ANOMALY_VARIANCE_FLOOR = 1.0      # Keeps near-silent baselines from over-scoring
+ANOMALY_Z_THRESHOLD = 3.0         # Score at which a provider counts as degraded
+ANOMALY_PARTIAL_MIN = 0.25        # Fraction of the current hour needed before it is scored
+
+
+def find_log_set(log_path):
+    """The live log and its rotated siblings, oldest first (by mtime).
+    
+    Siblings are numbered or dated `<name>.<suffix>` files in the same
+    directory, plain or compressed, e.g. gateway.log.1, gateway.log.2.gz or
+    gateway.log.20260101.zst.
+    """
+    directory, name = os.path.split(log_path)
+    members = []
+    try:
+        entries = os.listdir(directory)
+    except OSError:
         return []
+    for entry in entries:
+        suffix = entry[len(name) + 1:]
+        if entry != name and not (entry.startswith(name + ".") and suffix[:1].isdigit()):
+            continue
+        if entry.endswith(".tmp"):
+            continue  # Half-written archive from a rotation in progress
+        path = os.path.join(directory, entry)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        # Live file sorts last even if an archive was touched more recently
+        members.append((entry == name, st.st_mtime, path))
+    return [path for _, _, path in sorted(members)]
+
+
+def open_log(path):
+    """Open a plain, gzip or zstd log for binary line iteration, or None."""
+    if path.endswith(".gz"):
+        import gzip
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            print(f"Skipping {path}: install 'zstandard' to read .zst logs", file=os.sys.stderr)
+            return None
+        import io
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True))
+    return open(path, "rb")
+
+
+def _first_epoch_after(f, offset, size):
+    """Timestamp of the first complete timestamped line at or after offset."""
+    f.seek(offset)
+    if offset:
+        f.readline()  # Skip the partial line we landed in
+    while f.tell() < size:
+        epoch = parse_log_epoch(f.readline().decode("utf-8", errors="ignore"))
+        if epoch is not None:
+            return epoch
+    return None
+
+
+def seek_to_window(f, size, since):
+    """Binary-search a plain log for a line boundary at or before the first line newer than since."""
+    lo, hi = 0, size
+    while hi - lo > LOG_SEEK_MIN_SPAN:
+        mid = (lo + hi) // 2
+        epoch = _first_epoch_after(f, mid, size)
+        if epoch is None or epoch >= since:
+            hi = mid
+        else:
+            lo = mid
+    f.seek(lo)
+    if lo:
+        f.readline()
+    return f.tell()
+
+
+def _read_window_lines(path, since, budget):
+    """Lines newer than since from one log-set member, keeping at most the newest budget bytes."""
+    from collections import deque
     
-    since_time = datetime.now(timezone.utc).astimezone() - timedelta(hours=hours)
-    relevant_lines = []
+    f = open_log(path)
+    if f is None:
+        return [], 0
+    kept = deque()
+    used = 0
+    with f:
+        if not path.endswith(LOG_ARCHIVE_SUFFIXES):
+            size = os.fstat(f.fileno()).st_size
+            start = seek_to_window(f, size, since)
+            if size - budget > start:
+                f.seek(size - budget)
+                f.readline()
+        # Archives can't seek, so they are streamed and filtered
+        for raw in f:
+            line = raw.decode("utf-8", errors="ignore")
+            epoch = parse_log_epoch(line)
+            if epoch is None or epoch <= since:
+                continue
+            kept.append((len(raw), line))
+            used += len(raw)
+            while used > budget:
+                used -= kept.popleft()[0]
+    return [line for _, line in kept], used
+
+
+def read_log_file_tail(log_path, max_bytes=512*1024, hours=2):
+    """Read recent lines from a log and its rotated siblings within time window.
     
-    try:
-        with open(log_path, "r", encoding="utf-8", errors="ignore") as f:
-            f.seek(0, os.SEEK_END)
-            file_size = f.tell()
-            read_size = min(file_size, max_bytes)
-            f.seek(file_size - read_size)
-            lines = f.readlines()
-            
-            for line in lines:
-                match = re.match(r'^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})', line)
-                if match:
-                    try:
-                        # Parse UTC timestamp and convert to local time
-                        log_time_str = match.group(1)
-                        log_time = datetime.fromisoformat(log_time_str).replace(tzinfo=timezone.utc).astimezone()
-                        if log_time > since_time:
-                            relevant_lines.append(line)
-                    except ValueError:
-                        continue
-    except Exception as e:
-        print(f"Error reading {log_path}: {e}", file=os.sys.stderr)
-        
+    max_bytes is the total budget across the set, spent newest file first.
+    Members last modified before the window are skipped without opening them.
+    """
+    since = time.time() - hours * 3600
+    chunks = []
+    budget = max_bytes
+    
+    for path in reversed(find_log_set(log_path)):
+        if budget <= 0:
+            break
+        try:
+            if os.path.getmtime(path) < since:
+                break  # This member and everything older ends before the window
+            lines, used = _read_window_lines(path, since, budget)
+        except Exception as e:
+            print(f"Error reading {path}: {e}", file=os.sys.stderr)
+            continue
+        chunks.append(lines)
+        budget -= used
+    
+    relevant_lines = []
+    for lines in reversed(chunks):
+        relevant_lines.extend(lines)
     return relevant_lines
 
 
+def classify_llm_line(line):
+    """Classify an LLM error line as (category, provider), or None.
+    
+    Checks run in a fixed order and the first match wins. Provider is the
+    provider name only (never the full profile), "unknown" if not found.
+    A keyword prefilter skips the regexes for the (common) routine lines.
+    """
+    lower = line.lower()
+    if not any(keyword in lower for keyword in LLM_PREFILTER_KEYWORDS):
+        return None
+    
+    cooldown_match = re.search(LLM_PATTERNS["provider_cooldown"], line, re.I)
+    if cooldown_match:
+        return "cooldown", cooldown_match.group(1)
+    
+    unavailable_match = re.search(LLM_PATTERNS["provider_unavailable"], line, re.I)
+    if unavailable_match:
+        return "unavailable", unavailable_match.group(1)
+    
+    for category, key in (
+        ("auth_fail", "auth_fail"),
+        ("rate_limit", "rate_limit"),
+        ("timeout", "timeout"),
+        ("failover_error", "failover_error"),
+    ):
+        if re.search(LLM_PATTERNS[key], line, re.I):
+            return category, _provider_hint(line)
+    
+    profile_match = re.search(LLM_PATTERNS["profile_timeout"], line, re.I)
+    if profile_match:
+        return "profile_timeout", profile_match.group(1).split(":")[0]
+    
+    return None
+
+
+def _provider_hint(line):
+    profile_match = re.search(LLM_PATTERNS["profile_timeout"], line, re.I)
+    if profile_match:
+        return profile_match.group(1).split(":")[0]
+    hint_match = re.search(PROVIDER_HINT_PATTERN, line, re.I)
+    return hint_match.group(1).split(":")[0].lower() if hint_match else "unknown"
+
+
 def analyze_llm_health(lines):
     """Analyze LLM-related health indicators from log lines."""
     stats = {
@@ -81,72 +299,259 @@ def analyze_llm_health(lines):
         "providers_affected": set(),
         "profiles_timed_out": set(),
     }
+    detail_lists = {
+        "auth_fail": ("auth_failures", 150),
+        "rate_limit": ("rate_limits", 150),
+        "timeout": ("timeouts", 150),
+        "failover_error": ("failover_errors", 200),
+    }
     
     for line in lines:
-        # Provider cooldown/unavailable
-        cooldown_match = re.search(LLM_PATTERNS["provider_cooldown"], line, re.I)
-        if cooldown_match:
-            provider = cooldown_match.group(1)
-            stats["providers_affected"].add(provider)
-            stats["cooldown_events"].append({
-                "timestamp": extract_timestamp(line),
-                "provider": provider,
-                "status": "cooldown"
-            })
+        classified = classify_llm_line(line)
+        if not classified:
             continue
+        category, provider = classified
         
-        unavailable_match = re.search(LLM_PATTERNS["provider_unavailable"], line, re.I)
-        if unavailable_match:
-            provider = unavailable_match.group(1)
+        if category in ("cooldown", "unavailable"):
             stats["providers_affected"].add(provider)
             stats["cooldown_events"].append({
                 "timestamp": extract_timestamp(line),
                 "provider": provider,
-                "status": "unavailable"
+                "status": category
             })
-            continue
-        
-        # Auth failures
-        if re.search(LLM_PATTERNS["auth_fail"], line, re.I):
-            stats["auth_failures"].append({
+        elif category in detail_lists:
+            key, limit = detail_lists[category]
+            stats[key].append({
                 "timestamp": extract_timestamp(line),
-                "detail": line.strip()[:150]
+                "detail": line.strip()[:limit]
             })
+        elif category == "profile_timeout":
+            # Only the provider name, not the full profile (security)
+            stats["profiles_timed_out"].add(provider)
+    
+    return stats
+
+
+def strip_log_timestamp(detail):
+    """A log line's text without its leading ISO timestamp."""
+    return re.sub(r"^\d{4}-\d{2}-\d{2}T\S+\s*", "", detail)
+
+
+def group_error_events(events):
+    """Collapse repeated error details into groups with count and first/last seen.
+    
+    Details are grouped by signature: timestamp stripped, numbers and hex ids
+    masked. Groups are ranked by count.
+    """
+    groups = {}
+    for event in events:
+        detail = strip_log_timestamp(event["detail"])
+        signature = re.sub(r"\b[0-9a-f]{8,}\b|\d+", "#", detail)
+        group = groups.get(signature)
+        if group is None:
+            groups[signature] = {
+                "detail": detail[:100],
+                "count": 1,
+                "first": event["timestamp"],
+                "last": event["timestamp"],
+            }
+        else:
+            group["count"] += 1
+            group["last"] = event["timestamp"]
+    return sorted(groups.values(), key=lambda g: -g["count"])
+
+
+def parse_log_epoch(line):
+    """Epoch seconds of a log line's leading UTC timestamp, or None."""
+    try:
+        return datetime.fromisoformat(line[:19] + "+00:00").timestamp()
+    except ValueError:
+        return None
+
+
+def bucket_llm_errors(lines):
+    """Count LLM errors per hour bucket, provider and category.
+    
+    Returns (buckets, first_seen): buckets[hour_start][provider][category] = count,
+    first_seen[(hour_start, provider)] = "HH:MM" of the first error.
+    """
+    buckets = {}
+    first_seen = {}
+    for line in lines:
+        classified = classify_llm_line(line)
+        if not classified:
             continue
-        
-        # Rate limits
-        if re.search(LLM_PATTERNS["rate_limit"], line, re.I):
-            stats["rate_limits"].append({
-                "timestamp": extract_timestamp(line),
-                "detail": line.strip()[:150]
-            })
+        epoch = parse_log_epoch(line)
+        if epoch is None:
             continue
-        
-        # Timeouts
-        if re.search(LLM_PATTERNS["timeout"], line, re.I):
-            stats["timeouts"].append({
-                "timestamp": extract_timestamp(line),
-                "detail": line.strip()[:150]
-            })
+        category, provider = classified
+        hour = int(epoch // 3600 * 3600)
+        counts = buckets.setdefault(hour, {}).setdefault(provider, {})
+        counts[category] = counts.get(category, 0) + 1
+        seen = datetime.fromtimestamp(epoch).strftime("%H:%M")
+        if (hour, provider) not in first_seen or seen < first_seen[(hour, provider)]:
+            first_seen[(hour, provider)] = seen
+    return buckets, first_seen
+
+
+def rollup_llm_buckets(since):
+    """Hourly LLM error counts from the hour rollups, shaped like bucket_llm_errors().
+    
+    Unlike the byte-capped log tail, rollups see every line, so their hours
+    are complete. Brings the rollups up to date first.
+    """
+    conn = open_rollup_db()
+    try:
+        update_rollups(conn)
+        rows = conn.execute("""
+            SELECT bucket, provider, metric, SUM(count) FROM rollup
+            WHERE res = 'hour' AND source = 'gateway' AND metric LIKE 'llm.%' AND bucket >= ?
+            GROUP BY bucket, provider, metric
+        """, (since,)).fetchall()
+    finally:
+        conn.close()
+    buckets = {}
+    for hour, provider, metric, count in rows:
+        buckets.setdefault(hour, {}).setdefault(provider, {})[metric[len("llm."):]] = count
+    return buckets
+
+
+def _ewma_update(slot, value):
+    """Fold one observation into an EWMA [mean, variance, n] slot."""
+    mean, var, n = slot if slot else (float(value), 0.0, 0)
+    diff = value - mean
+    incr = ANOMALY_EWMA_ALPHA * diff
+    mean += incr
+    var = (1 - ANOMALY_EWMA_ALPHA) * (var + diff * incr)
+    return [round(mean, 4), round(var, 4), n + 1]
+
+
+def _anomaly_score(slots, hour_of_day, value):
+    """z-score of a count against its hour-of-day baseline (all-hours fallback)."""
+    slot = slots.get(f"h{hour_of_day}")
+    if not slot or slot[2] < ANOMALY_MIN_SAMPLES:
+        slot = slots.get("all")
+    if not slot or slot[2] < ANOMALY_MIN_SAMPLES:
+        return None  # Still learning
+    mean, var, _ = slot
+    return (value - mean) / max(var, ANOMALY_VARIANCE_FLOOR) ** 0.5
+
+
+def score_llm_anomalies(lines, hours):
+    """Score per-provider error counts against rolling baselines and find degraded spans.
+    
+    Hourly counts come from the hour rollups, because `lines` is capped
+    by a byte budget and may cut hours short. Hours are scored before
+    being absorbed into the baseline, and each complete hour is absorbed
+    only once (tracked by "absorbed_until"). The current hour is scaled to
+    a full-hour rate, and left out until ANOMALY_PARTIAL_MIN of it has
+    passed; "scores" reports the newest scored hour. If the rollups can't
+    be read, the lines are scored but nothing is absorbed, so truncated
+    counts never bias the baseline.
+    """
+    line_buckets, first_seen = bucket_llm_errors(lines)
+    now = time.time()
+    current_hour = int(now // 3600 * 3600)
+    first_hour = int((now - hours * 3600) // 3600 * 3600)
+    try:
+        buckets = rollup_llm_buckets(first_hour)
+        complete = True
+    except Exception as e:
+        print(f"Error reading LLM rollups, baselines not updated: {e}", file=os.sys.stderr)
+        buckets, complete = line_buckets, False
+    
+    try:
+        with open(LLM_BASELINE_FILE, "r", encoding="utf-8") as f:
+            baselines = json.load(f)
+    except (OSError, ValueError):
+        baselines = {}
+    providers = baselines.setdefault("providers", {})
+    
+    hour_range = range(first_hour, current_hour + 1, 3600)
+    elapsed = (now - current_hour) / 3600
+    scored_hours = [h for h in hour_range if h < current_hour or elapsed >= ANOMALY_PARTIAL_MIN]
+    known = set(providers) | {p for counts in buckets.values() for p in counts}
+    
+    # Score every hour in the window
+    scores = {}  # provider -> [(hour, score, category)]
+    for provider in sorted(known):
+        slots_by_cat = providers.get(provider, {})
+        categories = set(slots_by_cat) | {
+            c for counts in buckets.values() for c in counts.get(provider, {})
+        }
+        series = []
+        for hour in scored_hours:
+            counts = buckets.get(hour, {}).get(provider, {})
+            hour_of_day = datetime.fromtimestamp(hour).hour
+            scale = 1 / elapsed if hour == current_hour else 1
+            best = (None, None)
+            for category in categories:
+                z = _anomaly_score(slots_by_cat.get(category, {}), hour_of_day, counts.get(category, 0) * scale)
+                if z is not None and (best[0] is None or z > best[0]):
+                    best = (z, category)
+            series.append((hour, best[0], best[1]))
+        scores[provider] = series
+    
+    # Degraded spans: consecutive hours at or above the threshold
+    degraded = []
+    for provider, series in scores.items():
+        span = None
+        for hour, z, category in series:
+            if z is not None and z >= ANOMALY_Z_THRESHOLD:
+                if span is None:
+                    span = {
+                        "provider": provider,
+                        "since": first_seen.get((hour, provider), datetime.fromtimestamp(hour).strftime("%H:%M")),
+                        "until": None,
+                        "peak_score": z,
+                        "category": category,
+                    }
+                elif z > span["peak_score"]:
+                    span["peak_score"], span["category"] = z, category
+            elif span is not None:
+                span["until"] = datetime.fromtimestamp(hour).strftime("%H:%M")
+                degraded.append(span)
+                span = None
+        if span is not None:
+            degraded.append(span)  # Still degraded
+    for span in degraded:
+        span["peak_score"] = round(span["peak_score"], 1)
+    
+    # Absorb complete, not yet absorbed hours into the baselines. Rollup
+    # hours are whole even at the window's start, so only the current one waits
+    absorbed_until = baselines.get("absorbed_until", 0)
+    for hour in hour_range:
+        if not complete or hour + 3600 > now or hour < absorbed_until:
             continue
-        
-        # Failover errors
-        if re.search(LLM_PATTERNS["failover_error"], line, re.I):
-            stats["failover_errors"].append({
-                "timestamp": extract_timestamp(line),
-                "detail": line.strip()[:200]
-            })
+        hour_of_day = datetime.fromtimestamp(hour).hour
+        for provider in known:
+            slots_by_cat = providers.setdefault(provider, {})
+            counts = buckets.get(hour, {}).get(provider, {})
+            for category in set(slots_by_cat) | set(counts):
+                slots = slots_by_cat.setdefault(category, {})
+                value = counts.get(category, 0)
+                slots[f"h{hour_of_day}"] = _ewma_update(slots.get(f"h{hour_of_day}"), value)
+                slots["all"] = _ewma_update(slots.get("all"), value)
+        absorbed_until = hour + 3600
+    if absorbed_until != baselines.get("absorbed_until", 0):
+        baselines["absorbed_until"] = absorbed_until
+        try:
+            write_json_atomic(LLM_BASELINE_FILE, baselines)
+        except OSError as e:
+            print(f"Error writing LLM baselines: {e}", file=os.sys.stderr)
+    
+    latest = {}
+    for provider, series in scores.items():
+        if not series:
             continue
-        
-        # Profile timeouts - only capture provider name, not full profile (security)
-        profile_match = re.search(LLM_PATTERNS["profile_timeout"], line, re.I)
-        if profile_match:
-            profile = profile_match.group(1)
-            # Extract only provider name (e.g., "moonshot" from "moonshot:default")
-            provider_only = profile.split(":")[0] if ":" in profile else profile
-            stats["profiles_timed_out"].add(provider_only)
+        _, z, category = series[-1]
+        latest[provider] = {
+            "score": round(z, 1) if z is not None else None,
+            "category": category,
+            "baseline": "learning" if z is None else "ok",
+        }
     
-    return stats
+    return {"scores": latest, "degraded": degraded}
 
 
 def extract_timestamp(line):
@@ -163,27 +568,23 @@ def analyze_gateway_logs(lines):
         "model_switches": [],
     }
     
-    restart_patterns = [r"SIGUSR1", r"Starting gateway", r"Restarting"]
-    fallback_patterns = [r"fallback", r"switching to"]
-    model_patterns = [r"agent model:\s+(\S+)", r"using model:\s+(\S+)"]
-    
     for line in lines:
         # Restarts
-        if any(re.search(p, line, re.I) for p in restart_patterns):
+        if any(re.search(p, line, re.I) for p in GATEWAY_RESTART_PATTERNS):
             stats["restarts"].append({
                 "timestamp": extract_timestamp(line),
-                "detail": line.strip()[:100]
+                "detail": strip_log_timestamp(line.strip())[:100]
             })
         
         # Fallback hints
-        if any(re.search(p, line, re.I) for p in fallback_patterns):
+        if any(re.search(p, line, re.I) for p in GATEWAY_FALLBACK_PATTERNS):
             stats["fallbacks"].append({
                 "timestamp": extract_timestamp(line),
-                "detail": line.strip()[:100]
+                "detail": strip_log_timestamp(line.strip())[:100]
             })
         
         # Model usage tracking
-        for pattern in model_patterns:
+        for pattern in GATEWAY_MODEL_PATTERNS:
             match = re.search(pattern, line, re.I)
             if match:
                 stats["model_switches"].append({
@@ -194,9 +595,35 @@ def analyze_gateway_logs(lines):
     return stats
 
 
+def parse_audit_record(line):
+    """Decode one audit line into an event dict, or None if torn or corrupt.
+    
+    A line without its trailing newline is still being appended and is
+    never consumed. Framed records must match their length and checksum.
+    """
+    import zlib
+    
+    if not line.endswith("\n"):
+        return None
+    line = line[:-1]
+    match = re.match(AUDIT_FRAME_PATTERN, line)
+    if match:
+        payload = line[match.end():].encode("utf-8")
+        if len(payload) != int(match.group(1)) or zlib.crc32(payload) != int(match.group(2), 16):
+            return None
+        line = payload.decode("utf-8")
+    elif not line.startswith("{"):
+        return None
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) else None
+
+
 def get_watchdog_audit_events(hours=2):
     """Read watchdog audit events from the past N hours."""
-    audit_path = os.path.expanduser("~/clawd/watchdog-audit.jsonl")
+    audit_path = AUDIT_FILE
     if not os.path.exists(audit_path):
         return []
     
@@ -204,18 +631,19 @@ def get_watchdog_audit_events(hours=2):
     events = []
     
     try:
-        with open(audit_path, "r", encoding="utf-8") as f:
+        # No lock: the watchdog appends whole records, and parse_audit_record
+        # rejects anything it catches mid-write
+        with open(audit_path, "r", encoding="utf-8", errors="replace", newline="") as f:
             for line in f:
-                line = line.strip()
-                if not line:
+                event = parse_audit_record(line)
+                if event is None:
                     continue
                 try:
-                    event = json.loads(line)
                     event_time = datetime.fromisoformat(event.get("timestamp", ""))
-                    if event_time > since_time:
-                        events.append(event)
-                except (json.JSONDecodeError, ValueError):
+                except (ValueError, TypeError):
                     continue
+                if event_time > since_time:
+                    events.append(event)
     except Exception as e:
         print(f"Error reading audit file: {e}", file=os.sys.stderr)
     
@@ -227,6 +655,7 @@ def summarize_watchdog_events(events):
     summary = {
         "config_recoveries": [],
         "gateway_restarts": [],
+        "preemptive_restarts": [],
         "total_events": len(events)
     }
     
@@ -247,109 +676,286 @@ def summarize_watchdog_events(events):
                 "time": timestamp,
                 "status": status,
                 "reason": details.get("reason", "unknown"),
+                "action": details.get("action"),
                 "attempt": details.get("attempt", 0)
             })
+        elif event_type == "preemptive_restart":
+            summary["preemptive_restarts"].append({
+                "time": timestamp,
+                "status": status,
+                "reason": details.get("reason", "unknown")
+            })
     
     return summary
 
 
+def format_cron_job(job):
+    """Flatten a jobs.json entry into the fields the report uses."""
+    schedule = job.get("schedule", {})
+    payload = job.get("payload", {})
+    state = job.get("state", {})
+    
+    # Format schedule display
+    sched_kind = schedule.get("kind", "unknown")
+    if sched_kind == "cron":
+        sched_display = f"cron {schedule.get('expr', '')}"
+        if schedule.get("tz"):
+            sched_display += f" @ {schedule['tz']}"
+    elif sched_kind == "every":
+        every_ms = schedule.get("everyMs", 0)
+        sched_display = f"every {every_ms // 60000}m" if every_ms else "unknown"
+    elif sched_kind == "at":
+        at_ms = schedule.get("atMs", 0)
+        sched_display = f"at {at_ms}" if at_ms else "unknown"
+    else:
+        sched_display = sched_kind
+    
+    return {
+        "id": job.get("id", "unknown"),
+        "name": job.get("name", "unnamed"),
+        "schedule": sched_display,
+        "scheduleSpec": schedule,
+        "enabled": job.get("enabled", True),
+        "sessionTarget": job.get("sessionTarget", "main"),
+        "payloadKind": payload.get("kind", "unknown"),
+        "createdAtMs": job.get("createdAtMs"),
+        "lastRunAtMs": state.get("lastRunAtMs"),
+        "lastStatus": state.get("lastStatus"),
+        "lastDurationMs": state.get("lastDurationMs")
+    }
+
+
+def record_cron_runs(history, jobs):
+    """Fold the current jobs.json state into the per-job run history.
+    
+    A run is appended when lastRunAtMs moves forward; a changed status or
+    duration for the same run (job finished since last read) updates it in place.
+    """
+    entries = history.setdefault("jobs", {})
+    order = []
+    for raw_job in jobs:
+        job = format_cron_job(raw_job)
+        job_id = job["id"]
+        order.append(job_id)
+        entry = entries.setdefault(job_id, {"runs": []})
+        entry["job"] = job
+        
+        run_at = job["lastRunAtMs"]
+        if not run_at:
+            continue
+        run = [run_at, job["lastDurationMs"], job["lastStatus"]]
+        runs = entry["runs"]
+        if runs and runs[-1][0] == run_at:
+            runs[-1] = run
+        elif not runs or run_at > runs[-1][0]:
+            runs.append(run)
+            del runs[:-CRON_HISTORY_SIZE]
+    
+    # Forget jobs that were removed from jobs.json
+    history["jobs"] = {job_id: entries[job_id] for job_id in order}
+    history["order"] = order
+
+
 def get_cron_status():
-    """Get cron jobs status by reading cron jobs.json directly (avoids CLI hang)."""
+    """Get cron jobs status by reading cron jobs.json directly (avoids CLI hang).
+    
+    jobs.json is only re-parsed when its mtime/size changed since the last
+    call; otherwise jobs come straight from the stored run history.
+    """
     try:
         # Read cron jobs from dedicated cron directory
-        cron_jobs_path = os.path.expanduser("~/.openclaw/cron/jobs.json")
+        cron_jobs_path = CRON_JOBS_FILE
         if not os.path.exists(cron_jobs_path):
-            return {"error": "Cron jobs file not found", "jobs": []}
+            return {"error": "Cron jobs file not found", "jobs": [], "runs": {}}
         
-        with open(cron_jobs_path, 'r', encoding='utf-8') as f:
-            cron_data = json.load(f)
+        try:
+            with open(CRON_HISTORY_FILE, "r", encoding="utf-8") as f:
+                history = json.load(f)
+        except (OSError, ValueError):
+            history = {}
         
-        jobs = cron_data.get("jobs", [])
-        
-        # Format job info
-        formatted_jobs = []
-        for job in jobs:
-            schedule = job.get("schedule", {})
-            payload = job.get("payload", {})
-            state = job.get("state", {})
-            
-            # Format schedule display
-            sched_kind = schedule.get("kind", "unknown")
-            if sched_kind == "cron":
-                sched_display = f"cron {schedule.get('expr', '')}"
-                if schedule.get("tz"):
-                    sched_display += f" @ {schedule['tz']}"
-            elif sched_kind == "every":
-                every_ms = schedule.get("everyMs", 0)
-                sched_display = f"every {every_ms // 60000}m" if every_ms else "unknown"
-            elif sched_kind == "at":
-                at_ms = schedule.get("atMs", 0)
-                sched_display = f"at {at_ms}" if at_ms else "unknown"
-            else:
-                sched_display = sched_kind
-            
-            formatted_jobs.append({
-                "id": job.get("id", "unknown"),
-                "name": job.get("name", "unnamed"),
-                "schedule": sched_display,
-                "enabled": job.get("enabled", True),
-                "sessionTarget": job.get("sessionTarget", "main"),
-                "payloadKind": payload.get("kind", "unknown"),
-                "lastRunAtMs": state.get("lastRunAtMs"),
-                "lastStatus": state.get("lastStatus")
-            })
+        signature = source_signature([cron_jobs_path])[cron_jobs_path]
+        if history.get("source") != signature:
+            with open(cron_jobs_path, 'r', encoding='utf-8') as f:
+                cron_data = json.load(f)
+            record_cron_runs(history, cron_data.get("jobs", []))
+            history["source"] = signature
+            try:
+                write_json_atomic(CRON_HISTORY_FILE, history)
+            except OSError as e:
+                print(f"Error writing cron history: {e}", file=os.sys.stderr)
         
-        return {"jobs": formatted_jobs}
+        entries = history.get("jobs", {})
+        return {
+            "jobs": [entries[job_id]["job"] for job_id in history.get("order", [])],
+            "runs": {job_id: entries[job_id]["runs"] for job_id in history.get("order", [])}
+        }
     except Exception as e:
         import traceback
-        return {"error": str(e), "traceback": traceback.format_exc(), "jobs": []}
+        return {"error": str(e), "traceback": traceback.format_exc(), "jobs": [], "runs": {}}
+
+
+CRON_FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+CRON_NAMES = {
+    3: {m: i + 1 for i, m in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"])},
+    4: {d: i for i, d in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])},
+}
+CRON_MACROS = {
+    "@yearly": "0 0 1 1 *", "@annually": "0 0 1 1 *", "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0", "@daily": "0 0 * * *", "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
 
 
-def main():
-    hours = 4
+def parse_cron_field(field, index):
+    """Expand one cron field (*, lists, ranges, steps, names) into a set of ints."""
+    lo, hi = CRON_FIELD_RANGES[index]
+    names = CRON_NAMES.get(index, {})
     
-    # Read both log files
-    gateway_lines = read_log_file_tail(
-        os.path.join(LOG_DIR, "gateway.log"), 
-        max_bytes=512*1024, 
-        hours=hours
-    )
+    def value(token):
+        return names[token.lower()] if token.lower() in names else int(token)
+    
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+        if part in ("*", "?"):
+            start, end = lo, hi
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = value(start_text), value(end_text)
+        else:
+            start = value(part)
+            end = hi if step > 1 else start
+        values.update(range(start, end + 1, step))
+    if index == 4 and 7 in values:
+        values.add(0)  # 7 is also Sunday
+    return values
+
+
+def next_cron_time(expr, after):
+    """Next datetime strictly after `after` (aware) matching a 5-field cron expression."""
+    fields = CRON_MACROS.get(expr.strip(), expr).split()
+    if len(fields) != 5:
+        raise ValueError(f"Unsupported cron expression: {expr}")
+    minutes, hours, days, months, weekdays = (parse_cron_field(f, i) for i, f in enumerate(fields))
+    dom_any, dow_any = fields[2] in ("*", "?"), fields[4] in ("*", "?")
+    
+    def day_matches(t):
+        dom_ok = t.day in days
+        dow_ok = (t.weekday() + 1) % 7 in weekdays
+        if dom_any or dow_any:
+            return dom_ok and dow_ok
+        return dom_ok or dow_ok  # Both restricted: cron matches either
+    
+    t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = t + timedelta(days=366 * 4)
+    while t < limit:
+        if t.month not in months:
+            t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+        elif not day_matches(t):
+            t = t.replace(hour=0, minute=0) + timedelta(days=1)
+        elif t.hour not in hours:
+            t = t.replace(minute=0) + timedelta(hours=1)
+        elif t.minute not in minutes:
+            t += timedelta(minutes=1)
+        else:
+            return t
+    return None
+
+
+def next_expected_run_ms(job):
+    """When the job should next run, based on its schedule and last run (ms epoch)."""
+    schedule = job.get("scheduleSpec") or {}
+    kind = schedule.get("kind")
+    last_run = job.get("lastRunAtMs")
+    
+    if kind == "every":
+        every_ms = schedule.get("everyMs")
+        base = last_run or schedule.get("anchorMs") or job.get("createdAtMs")
+        return base + every_ms if every_ms and base else None
+    
+    if kind == "at":
+        at_ms = schedule.get("atMs")
+        if not at_ms or (last_run and last_run >= at_ms):
+            return None  # One-shot job already ran
+        return at_ms
+    
+    if kind == "cron":
+        base = last_run or job.get("createdAtMs")
+        if not base or not schedule.get("expr"):
+            return None
+        tz = None
+        if schedule.get("tz"):
+            try:
+                from zoneinfo import ZoneInfo
+                tz = ZoneInfo(schedule["tz"])
+            except Exception:
+                tz = None
+        after = datetime.fromtimestamp(base / 1000, tz or timezone.utc)
+        if tz is None:
+            after = after.astimezone()
+        try:
+            next_time = next_cron_time(schedule["expr"], after)
+        except (ValueError, KeyError):
+            return None
+        return int(next_time.timestamp() * 1000) if next_time else None
+    
+    return None
+
+
+def analyze_cron_job(job, runs, now_ms):
+    """Overdue, duration-regression and failure-streak analytics for one job."""
+    expected = next_expected_run_ms(job)
+    overdue_ms = 0
+    if job.get("enabled", True) and expected:
+        schedule = job.get("scheduleSpec") or {}
+        grace = max(CRON_OVERDUE_GRACE_MS, (schedule.get("everyMs") or 0) // 10)
+        if now_ms > expected + grace:
+            overdue_ms = now_ms - expected
+    
+    # Only the newest run is judged; if it has no duration there is nothing to compare
+    last_ms = runs[-1][1] if runs else None
+    earlier = sorted(r[1] for r in runs[:-1] if r[1] is not None)
+    median_ms = None
+    regression = False
+    if last_ms is not None and len(earlier) >= CRON_DURATION_MIN_SAMPLES:
+        median_ms = earlier[len(earlier) // 2]
+        regression = last_ms > median_ms * CRON_DURATION_REGRESSION_FACTOR
+    
+    streak = 0
+    for run in reversed(runs):
+        if run[2] in CRON_OK_STATUSES:
+            break
+        streak += 1
+    
+    return {
+        "nextExpectedAtMs": expected,
+        "overdueMs": overdue_ms,
+        "lastDurationMs": last_ms,
+        "medianDurationMs": median_ms,
+        "durationRegression": regression,
+        "failureStreak": streak,
+    }
+
+
+def build_log_section(hours):
+    """Gateway and LLM health from gateway.log and gateway.err.log."""
+    gateway_lines = read_log_file_tail(GATEWAY_LOG, max_bytes=512*1024, hours=hours)
     error_lines = read_log_file_tail(
-        os.path.join(LOG_DIR, "gateway.err.log"), 
+        ERROR_LOG,
         max_bytes=256*1024,  # Smaller for error log
         hours=hours
     )
     
-    # Analyze
     gateway_stats = analyze_gateway_logs(gateway_lines)
     llm_stats = analyze_llm_health(error_lines + gateway_lines)
-    watchdog_events = get_watchdog_audit_events(hours=hours)
-    watchdog_summary = summarize_watchdog_events(watchdog_events)
-    cron_data = get_cron_status()
+    llm_anomalies = score_llm_anomalies(error_lines + gateway_lines, hours)
     
-    # Summarize cron jobs
-    cron_summary = []
-    if "jobs" in cron_data:
-        for job in cron_data["jobs"]:
-            # Format last run time
-            last_run_ms = job.get("lastRunAtMs")
-            last_run_str = None
-            if last_run_ms:
-                last_run_dt = datetime.fromtimestamp(last_run_ms / 1000)
-                last_run_str = last_run_dt.strftime("%m-%d %H:%M")
-            
-            cron_summary.append({
-                "name": job.get("name"),
-                "schedule": job.get("schedule"),
-                "enabled": job.get("enabled"),
-                "lastStatus": job.get("lastStatus"),
-                "lastRun": last_run_str,
-                "payloadKind": job.get("payloadKind")
-            })
-    
-    # Build comprehensive output
-    output = {
-        "window_hours": hours,
+    return {
         "data_sources": {
             "gateway_log_lines": len(gateway_lines),
             "error_log_lines": len(error_lines)
@@ -372,12 +978,762 @@ def main():
                 for e in llm_stats["failover_errors"][-3:]
             ],
             "model_switches": gateway_stats["model_switches"][-5:],
+            "error_groups": group_error_events(
+                llm_stats["failover_errors"] + llm_stats["rate_limits"]
+                + llm_stats["timeouts"] + llm_stats["auth_failures"]
+            )[:ERROR_GROUP_LIMIT],
         },
-        "cron_jobs": cron_summary,
-        "watchdog_self_healing": watchdog_summary
+        "llm_anomalies": llm_anomalies,
+    }
+
+
+def build_watchdog_section(hours):
+    """Self-healing events from the watchdog audit file."""
+    return {"watchdog_self_healing": summarize_watchdog_events(get_watchdog_audit_events(hours=hours))}
+
+
+def build_cron_section(hours):
+    """Cron job status and alerts from cron/jobs.json (window independent)."""
+    cron_data = get_cron_status()
+    now_ms = int(time.time() * 1000)
+    
+    def fmt_ms(ms):
+        return datetime.fromtimestamp(ms / 1000).strftime("%m-%d %H:%M") if ms else None
+    
+    cron_summary = []
+    cron_alerts = []
+    for job in cron_data.get("jobs", []):
+        analytics = analyze_cron_job(job, cron_data["runs"].get(job["id"], []), now_ms)
+        name = job.get("name")
+        
+        cron_summary.append({
+            "name": name,
+            "schedule": job.get("schedule"),
+            "enabled": job.get("enabled"),
+            "lastStatus": job.get("lastStatus"),
+            "lastRun": fmt_ms(job.get("lastRunAtMs")),
+            "lastDurationMs": job.get("lastDurationMs"),
+            "nextExpected": fmt_ms(analytics["nextExpectedAtMs"]),
+            "payloadKind": job.get("payloadKind")
+        })
+        
+        if analytics["overdueMs"]:
+            cron_alerts.append({
+                "job": name,
+                "kind": "overdue",
+                "detail": f"expected {fmt_ms(analytics['nextExpectedAtMs'])}, "
+                          f"{analytics['overdueMs'] // 60000} min late"
+            })
+        if analytics["durationRegression"]:
+            cron_alerts.append({
+                "job": name,
+                "kind": "slow",
+                "detail": f"last run {analytics['lastDurationMs'] // 1000}s vs median "
+                          f"{analytics['medianDurationMs'] // 1000}s"
+            })
+        if analytics["failureStreak"] >= CRON_FAILURE_STREAK_ALERT:
+            cron_alerts.append({
+                "job": name,
+                "kind": "failing",
+                "detail": f"{analytics['failureStreak']} consecutive failed runs"
+            })
+    
+    return {"cron_jobs": cron_summary, "cron_alerts": cron_alerts}
+
+
+# Snapshot section -> builder. With --cached a section is served until it is
+# older than the TTL, even if its sources changed since: gateway.log changes on
+# nearly every write, so the TTL is the staleness bound.
+SNAPSHOT_SECTIONS = {
+    "logs": build_log_section,
+    "cron": build_cron_section,
+    "watchdog": build_watchdog_section,
+}
+
+
+def write_json_atomic(path, data):
+    """Write JSON via a temp file + rename so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def source_signature(paths):
+    """Cheap change detection: (mtime_ns, size) per source file, None if missing."""
+    signature = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature[path] = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            signature[path] = None
+    return signature
+
+
+def load_snapshot():
+    try:
+        with open(SNAPSHOT_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def get_snapshot(hours, ttl=None):
+    """Return the health snapshot, refreshing stale sections in place.
+
+    With ttl=None every section is rebuilt. Otherwise a stored section is
+    reused while it is younger than ttl seconds.
+    """
+    snapshot = load_snapshot() if ttl is not None else {}
+    if snapshot.get("window_hours") != hours:
+        snapshot = {}
+    sections = snapshot.get("sections", {})
+    
+    now = time.time()
+    changed = False
+    for name, builder in SNAPSHOT_SECTIONS.items():
+        cached = sections.get(name)
+        if ttl is not None and cached and now - cached.get("built_at", 0) < ttl:
+            continue
+        sections[name] = {"built_at": now, "data": builder(hours)}
+        changed = True
+    
+    snapshot = {"window_hours": hours, "sections": sections}
+    if changed:
+        try:
+            write_json_atomic(SNAPSHOT_FILE, snapshot)
+        except OSError as e:
+            print(f"Error writing snapshot: {e}", file=os.sys.stderr)
+    return snapshot
+
+
+def render_snapshot(snapshot):
+    """Assemble the report JSON from snapshot sections."""
+    sections = snapshot["sections"]
+    oldest = min(section["built_at"] for section in sections.values())
+    output = {
+        "window_hours": snapshot["window_hours"],
+        "generated_at": datetime.fromtimestamp(oldest).isoformat(timespec="seconds"),
     }
+    output.update(sections["logs"]["data"])
+    output.update(sections["cron"]["data"])
+    output.update(sections["watchdog"]["data"])
+    return output
+
+
+def _collapse_repeats(items):
+    """Merge list items identical apart from their time into one with count/first/last."""
+    if not all(isinstance(i, dict) and ("time" in i or "timestamp" in i) for i in items):
+        return items  # Not timed events (or already grouped)
+    merged = {}
+    for item in items:
+        when = item.get("time") or item.get("timestamp")
+        key = json.dumps({k: v for k, v in item.items() if k not in ("time", "timestamp")}, sort_keys=True)
+        if key not in merged:
+            merged[key] = dict(item, count=1, first=when, last=when)
+            merged[key].pop("time", None)
+            merged[key].pop("timestamp", None)
+        else:
+            merged[key]["count"] += 1
+            merged[key]["last"] = when
+    collapsed = list(merged.values())
+    for item in collapsed:
+        if item["count"] == 1:
+            item.pop("count")
+            item["time"] = item.pop("first")
+            item.pop("last")
+    return sorted(collapsed, key=lambda i: -i.get("count", 1))
+
+
+def _compact(value):
+    """Drop empty values and collapse repeated events, recursively."""
+    if isinstance(value, dict):
+        compacted = {k: _compact(v) for k, v in value.items()}
+        return {k: v for k, v in compacted.items() if v not in (None, [], {}, "")}
+    if isinstance(value, list):
+        return _collapse_repeats([_compact(v) for v in value])
+    return value
+
+
+def _encode(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def build_report_payload(output, budget=REPORT_BUDGET_BYTES, previous=None):
+    """Build a size-bounded report payload for the audit agent.
+    
+    Sections identical to the previous report are listed under "unchanged"
+    instead of repeated; repeated events are collapsed; then the lowest-ranked
+    items of REPORT_TRIM_ORDER lists are dropped until the encoding, including
+    the "omitted" tally, fits. If it still doesn't, the tally is summed per
+    section and REPORT_DROP_ORDER entries are dropped whole.
+    """
+    # Diff the raw sections: `previous` is the raw output saved by main()
+    unchanged = []
+    if previous:
+        unchanged = [
+            name for name in REPORT_DIFF_SECTIONS
+            if name in output and output[name] == previous.get(name)
+        ]
+    payload = {k: v for k, v in output.items() if k not in unchanged}
+    if unchanged:
+        payload["unchanged"] = unchanged
+    
+    if payload.get("llm_health", {}).get("error_groups"):
+        payload["llm_health"] = dict(payload["llm_health"])
+        payload["llm_health"].pop("recent_failover_errors", None)
+    
+    # Failing and enabled jobs first, so healthy ones are trimmed first
+    if payload.get("cron_jobs"):
+        payload["cron_jobs"] = sorted(
+            payload["cron_jobs"],
+            key=lambda j: (j.get("lastStatus") in CRON_OK_STATUSES, not j.get("enabled", True))
+        )
+    
+    payload = _compact(payload)
+    
+    omitted = {}
+    
+    def over_budget():
+        report = dict(payload, omitted=omitted) if omitted else payload
+        return len(_encode(report).encode("utf-8")) > budget
+    
+    for path in REPORT_TRIM_ORDER:
+        if not over_budget():
+            break
+        parent = payload
+        for key in path[:-1]:
+            parent = parent.get(key, {})
+        items = parent.get(path[-1])
+        if not isinstance(items, list):
+            continue
+        while items and over_budget():
+            items.pop()
+            omitted[".".join(path)] = omitted.get(".".join(path), 0) + 1
+        if not items:
+            parent.pop(path[-1])
+    
+    if over_budget():
+        by_section = {}
+        for path, count in omitted.items():
+            section = path.split(".")[0]
+            by_section[section] = by_section.get(section, 0) + count
+        omitted = by_section
+    for path in REPORT_DROP_ORDER:
+        if not over_budget():
+            break
+        parent = payload
+        for key in path[:-1]:
+            parent = parent.get(key, {})
+        value = parent.pop(path[-1], None)
+        if value:
+            dropped = len(value) if isinstance(value, (list, dict)) else 1
+            omitted[path[0]] = omitted.get(path[0], 0) + dropped
+        if parent == {} and path[0] in payload:
+            payload.pop(path[0])
+    if omitted:
+        payload["omitted"] = omitted
+    
+    return payload
+
+
+def open_rollup_db():
+    """Open (and create) the rollup database in WAL mode so readers never block the ingester."""
+    import sqlite3
+    
+    os.makedirs(GUARDIAN_DIR, exist_ok=True)
+    conn = sqlite3.connect(ROLLUP_DB, timeout=5)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS rollup (
+            res TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            source TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            provider TEXT NOT NULL,         -- LLM provider (llm.* metrics only)
+            subject TEXT NOT NULL,          -- Cron job name or watchdog failure reason
+            count INTEGER NOT NULL,
+            total REAL NOT NULL,
+            timed INTEGER NOT NULL DEFAULT 0, -- Events summed into total (e.g. cron runs with a duration)
+            PRIMARY KEY (res, bucket, source, metric, provider, subject)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS ingest_offset (
+            source TEXT PRIMARY KEY,
+            inode INTEGER,
+            offset INTEGER NOT NULL,
+            head TEXT,
+            last_ts REAL NOT NULL
+        );
+    """)
+    if conn.execute("PRAGMA user_version").fetchone()[0] < ROLLUP_SCHEMA_VERSION:
+        _migrate_rollup_db(conn)
+    return conn
+
+
+def _migrate_rollup_db(conn):
+    """Bring an older rollup database up to ROLLUP_SCHEMA_VERSION, keeping its history."""
+    with conn:
+        offset_columns = [row[1] for row in conn.execute("PRAGMA table_info(ingest_offset)")]
+        if "head" not in offset_columns:
+            conn.execute("ALTER TABLE ingest_offset ADD COLUMN head TEXT")
+        rollup_columns = [row[1] for row in conn.execute("PRAGMA table_info(rollup)")]
+        if "subject" not in rollup_columns:
+            # Cron job names and watchdog reasons used to live in `provider`
+            conn.executescript("""
+                CREATE TABLE rollup_v3 (
+                    res TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    source TEXT NOT NULL,
+                    metric TEXT NOT NULL,
+                    provider TEXT NOT NULL,
+                    subject TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    total REAL NOT NULL,
+                    PRIMARY KEY (res, bucket, source, metric, provider, subject)
+                ) WITHOUT ROWID;
+                INSERT INTO rollup_v3
+                    SELECT res, bucket, source, metric,
+                           CASE WHEN source = 'gateway' THEN provider ELSE '' END,
+                           CASE WHEN source = 'gateway' THEN '' ELSE provider END,
+                           count, total
+                    FROM rollup;
+                DROP TABLE rollup;
+                ALTER TABLE rollup_v3 RENAME TO rollup;
+            """)
+        if "timed" not in [row[1] for row in conn.execute("PRAGMA table_info(rollup)")]:
+            # Older rows can't tell untimed runs apart; count every run of a timed bucket
+            conn.execute("ALTER TABLE rollup ADD COLUMN timed INTEGER NOT NULL DEFAULT 0")
+            conn.execute("UPDATE rollup SET timed = count WHERE total > 0")
+        conn.execute(f"PRAGMA user_version = {ROLLUP_SCHEMA_VERSION}")
+
+
+# Local-midnight epoch per 15-minute slot. UTC offsets and DST switches fall
+# on 15-minute boundaries, so a slot never straddles local midnight
+_day_buckets = {}
+
+
+def _day_bucket(epoch):
+    """Local-midnight bucket for an epoch."""
+    slot = int(epoch // 900)
+    if slot not in _day_buckets:
+        _day_buckets[slot] = int(datetime.fromtimestamp(epoch).replace(
+            hour=0, minute=0, second=0, microsecond=0).timestamp())
+    return _day_buckets[slot]
+
+
+def _add_event(pending, epoch, source, metric, provider="", subject="", value=None):
+    """Count one event into every rollup resolution.
+    
+    `value` (e.g. a cron run's duration) is summed into `total`, and `timed`
+    counts the events that had one, so averages skip events without a value.
+    """
+    for res, width in ROLLUP_RESOLUTIONS.items():
+        bucket = _day_bucket(epoch) if res == "day" else int(epoch // width * width)
+        key = (res, bucket, source, metric, provider or "", subject or "")
+        counts = pending.get(key)
+        if counts is None:
+            counts = pending[key] = [0, 0.0, 0]
+        counts[0] += 1
+        if value is not None:
+            counts[1] += value
+            counts[2] += 1
+
+
+def classify_gateway_line(line):
+    """Rollup metrics for one gateway/error log line: [(metric, provider)]."""
+    metrics = []
+    classified = classify_llm_line(line)
+    if classified:
+        metrics.append((f"llm.{classified[0]}", classified[1]))
+    # The lifecycle patterns are plain literals, so substring checks suffice
+    lower = line.lower()
+    if any(p.lower() in lower for p in GATEWAY_RESTART_PATTERNS):
+        metrics.append(("gateway.restart", ""))
+    if any(p.lower() in lower for p in GATEWAY_FALLBACK_PATTERNS):
+        metrics.append(("gateway.fallback", ""))
+    return metrics
+
+
+def _iter_complete_lines(path, offset):
+    """Yield (line, end_offset) for complete lines of a log-set member from offset.
+    
+    Offsets are in uncompressed bytes, so a member compressed after it was
+    last read can be drained from where ingestion stopped.
+    """
+    f = open_log(path)
+    if f is None:
+        return
+    with f:
+        if path.endswith(LOG_ARCHIVE_SUFFIXES):
+            skip = offset
+            while skip > 0:
+                chunk = f.read(min(skip, 1024 * 1024))
+                if not chunk:
+                    return
+                skip -= len(chunk)
+        else:
+            f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break  # Partial line still being written
+            offset += len(raw)
+            yield raw.decode("utf-8", errors="ignore"), offset
+
+
+def _log_head(path):
+    """First line (up to ROLLUP_HEAD_BYTES) of a log-set member, or None."""
+    try:
+        f = open_log(path)
+        if f is None:
+            return None
+        with f:
+            return f.readline(ROLLUP_HEAD_BYTES).decode("utf-8", errors="ignore") or None
+    except OSError:
+        return None
+
+
+def _find_rotated(path, inode, head):
+    """The rotated sibling holding the file last ingested as `path`, or None.
+    
+    A renamed file keeps its inode; a compressed or copied one is recognised
+    by its first line.
+    """
+    for member in reversed(find_log_set(path)):
+        if member == path:
+            continue
+        try:
+            if not member.endswith(LOG_ARCHIVE_SUFFIXES) and os.stat(member).st_ino == inode:
+                return member
+        except OSError:
+            continue
+        if head and _log_head(member) == head:
+            return member
+    return None
+
+
+def _ingest_plan(conn, source, path):
+    """Log-set members still to ingest for a source, as [(member, start_offset)], oldest first.
+    
+    - no stored offset: the whole log set (backfill, rotated members included)
+    - offset in the live file: the live file from there
+    - offset in a rotated member (found by inode, or by first line once
+      compressed or copied): the rest of it, newer members, then the live file
+    - offset in a member that no longer exists: the live file from 0
+    """
+    members = find_log_set(path)
+    if path not in members:
+        return []
+    row = conn.execute(
+        "SELECT inode, offset, head FROM ingest_offset WHERE source = ?", (source,)
+    ).fetchone()
+    if row is None:
+        return [(member, 0) for member in members]
+    
+    try:
+        st = os.stat(path)
+    except OSError:
+        return []
+    if row[0] == st.st_ino and row[1] <= st.st_size:
+        return [(path, row[1])] if row[1] < st.st_size else []
+    rotated = _find_rotated(path, row[0], row[2])
+    if rotated is None:
+        return [(path, 0)]
+    newer = members[members.index(rotated) + 1:]
+    return [(rotated, row[1])] + [(member, 0) for member in newer]
+
+
+def _flush_rollups(conn, pending, offsets):
+    """Upsert pending rollup counts and ingest offsets in one transaction."""
+    with conn:
+        conn.executemany("""
+            INSERT INTO rollup (res, bucket, source, metric, provider, subject, count, total, timed)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (res, bucket, source, metric, provider, subject)
+            DO UPDATE SET count = count + excluded.count, total = total + excluded.total,
+                          timed = timed + excluded.timed
+        """, [key + tuple(counts) for key, counts in pending.items()])
+        conn.executemany(
+            "INSERT OR REPLACE INTO ingest_offset (source, inode, offset, head, last_ts) VALUES (?, ?, ?, ?, ?)",
+            [(source,) + record for source, record in offsets.items()]
+        )
+    added = sum(counts[0] for key, counts in pending.items() if key[0] == "minute")
+    pending.clear()
+    return added
+
+
+def _ingest_log(conn, source, path, fold_line):
+    """Stream a source's unread lines through fold_line(pending, line), committing in chunks.
+    
+    Each commit stores the position reached, so an interrupted backfill
+    resumes where it stopped. Returns the number of events added.
+    """
+    added = 0
+    pending = {}
+    for member, offset in _ingest_plan(conn, source, path):
+        try:
+            inode = os.stat(member).st_ino
+        except OSError:
+            continue
+        head = _log_head(member)
+        end = offset
+        for count, (line, end) in enumerate(_iter_complete_lines(member, offset), 1):
+            fold_line(pending, line)
+            if count % ROLLUP_CHUNK_LINES == 0:
+                added += _flush_rollups(conn, pending, {source: (inode, end, head, time.time())})
+        added += _flush_rollups(conn, pending, {source: (inode, end, head, time.time())})
+    return added
+
+
+def _fold_gateway_line(pending, line):
+    epoch = parse_log_epoch(line)
+    if epoch is None:
+        return
+    for metric, provider in classify_gateway_line(line):
+        _add_event(pending, epoch, "gateway", metric, provider)
+
+
+def _fold_audit_line(pending, line):
+    event = parse_audit_record(line)
+    if event is None:
+        return
+    try:
+        epoch = datetime.fromisoformat(event.get("timestamp", "")).timestamp()
+    except (ValueError, TypeError):
+        return
+    details = event.get("details") or {}
+    _add_event(pending, epoch, "watchdog", f"watchdog.{event.get('type')}.{event.get('status')}",
+               subject=details.get("reason"))
+
+
+def update_rollups(conn=None):
+    """Fold new gateway log lines, audit events and cron runs into the rollups.
     
-    print(json.dumps(output, ensure_ascii=False, indent=2))
+    Each source remembers how far it was ingested, so a call only reads what
+    was appended since the previous one; with no record yet, the whole log
+    set (rotated members included) is backfilled. Lines are streamed and
+    committed in chunks. Returns the number of events added, or 0 if another
+    process is already ingesting.
+    """
+    import fcntl
+    
+    own_conn = conn is None
+    conn = conn or open_rollup_db()
+    # One ingester at a time, without holding SQLite's write lock throughout;
+    # WAL keeps queries unblocked between chunk commits
+    lock_fd = os.open(ROLLUP_LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return 0
+        
+        added = _ingest_log(conn, "gateway", GATEWAY_LOG, _fold_gateway_line)
+        added += _ingest_log(conn, "gateway_err", ERROR_LOG, _fold_gateway_line)
+        added += _ingest_log(conn, "audit", AUDIT_FILE, _fold_audit_line)
+        
+        row = conn.execute("SELECT last_ts FROM ingest_offset WHERE source = 'cron'").fetchone()
+        cron_since = row[0] if row else 0
+        cron_until = cron_since
+        pending = {}
+        cron = get_cron_status()
+        names = {job["id"]: job.get("name") for job in cron.get("jobs", [])}
+        for job_id, runs in cron.get("runs", {}).items():
+            for run_at, duration, status in runs:
+                if run_at > cron_since:
+                    _add_event(pending, run_at / 1000, "cron", f"cron.{status or 'unknown'}",
+                               subject=names.get(job_id, job_id),
+                               value=float(duration) if duration is not None else None)
+                    cron_until = max(cron_until, run_at)
+        if cron_until > cron_since:
+            added += _flush_rollups(conn, pending, {"cron": (None, 0, None, cron_until)})
+        
+        with conn:
+            now = time.time()
+            for res, days in ROLLUP_RETENTION_DAYS.items():
+                conn.execute("DELETE FROM rollup WHERE res = ? AND bucket < ?", (res, now - days * 86400))
+    finally:
+        os.close(lock_fd)
+        if own_conn:
+            conn.close()
+    return added
+
+
+def parse_duration(text):
+    """Parse durations like 90s, 15m, 4h, 7d into seconds."""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+    text = text.strip().lower()
+    if text[-1:] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+def _pick_resolution(span_seconds, group_by):
+    """Finest time grouping requested, else the coarsest resolution that still fits the span."""
+    for res in ("minute", "hour", "day"):
+        if res in group_by:
+            return res
+    if span_seconds <= 6 * 3600 and span_seconds <= ROLLUP_RETENTION_DAYS["minute"] * 86400:
+        return "minute"
+    if span_seconds <= 3 * 86400:
+        return "hour"
+    return "day"
+
+
+def query_rollups(since, until=None, group_by=(), metrics=None, conn=None):
+    """Aggregate rollups between two epochs, grouped by QUERY_GROUP_FIELDS.
+    
+    `metrics` is a list of metric prefixes (e.g. ["llm.", "cron.error"]).
+    Window edges are rounded to the chosen resolution. Returns
+    (resolution, rows) where each row has the group fields, count and, when
+    any grouped event carried a value, its average over those events.
+    """
+    until = until or time.time()
+    res = _pick_resolution(until - since, group_by)
+    width = ROLLUP_RESOLUTIONS[res]
+    
+    sql = ("SELECT bucket, source, metric, provider, subject, SUM(count), SUM(total), SUM(timed) FROM rollup "
+           "WHERE res = ? AND bucket >= ? AND bucket < ?")
+    params = [res, int(since // width * width) if res != "day" else _day_bucket(since), until]
+    if metrics:
+        sql += " AND (" + " OR ".join("metric LIKE ?" for _ in metrics) + ")"
+        params.extend(m.replace("%", "") + "%" for m in metrics)
+    sql += " GROUP BY bucket, source, metric, provider, subject"
+    
+    own_conn = conn is None
+    conn = conn or open_rollup_db()
+    raw_rows = conn.execute(sql, params).fetchall()
+    if own_conn:
+        conn.close()
+    
+    formats = {"minute": "%Y-%m-%d %H:%M", "hour": "%Y-%m-%d %H:00", "day": "%Y-%m-%d"}
+    grouped = {}
+    for bucket, source, metric, provider, subject, count, total, timed in raw_rows:
+        fields = {"source": source, "metric": metric, "provider": provider, "subject": subject}
+        when = datetime.fromtimestamp(bucket)
+        for time_field, fmt in formats.items():
+            fields[time_field] = when.strftime(fmt)
+        key = tuple(fields[g] for g in group_by)
+        row = grouped.setdefault(key, [0, 0.0, 0])
+        row[0] += count
+        row[1] += total
+        row[2] += timed
+    
+    rows = []
+    for key in sorted(grouped):
+        count, total, timed = grouped[key]
+        row = dict(zip(group_by, key))
+        row["count"] = count
+        if timed:
+            row["avg"] = round(total / timed, 1)
+        rows.append(row)
+    return res, rows
+
+
+def query_main(argv):
+    """`health_fetcher.py query`: long-range questions answered from rollups."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        prog="health_fetcher.py query",
+        description="Query pre-aggregated guardian rollups (gateway logs, watchdog audit, cron runs)"
+    )
+    parser.add_argument("--since", default="24h", help="Window start, e.g. 90m, 4h, 7d")
+    parser.add_argument("--until", help="Window end as age, e.g. 1d (default: now)")
+    parser.add_argument("--group-by", default="metric",
+                        help=f"Comma-separated fields: {','.join(QUERY_GROUP_FIELDS)}")
+    parser.add_argument("--metric", help="Comma-separated metric prefixes, e.g. llm.,watchdog.gateway_restart "
+                                         "(default: all; llm. when grouping by provider)")
+    parser.add_argument("--format", choices=["json", "table"], default="json")
+    parser.add_argument("--no-update", action="store_true",
+                        help="Skip ingesting new data before answering")
+    args = parser.parse_args(argv)
+    
+    group_by = [g for g in args.group_by.split(",") if g]
+    unknown = [g for g in group_by if g not in QUERY_GROUP_FIELDS]
+    if unknown:
+        parser.error(f"unknown --group-by field(s): {', '.join(unknown)}")
+    
+    now = time.time()
+    since = now - parse_duration(args.since)
+    until = now - parse_duration(args.until) if args.until else now
+    
+    conn = open_rollup_db()
+    if not args.no_update:
+        update_rollups(conn)
+    metrics = args.metric.split(",") if args.metric else None
+    if metrics is None and "provider" in group_by:
+        metrics = ["llm."]  # Only LLM metrics carry a provider
+    res, rows = query_rollups(since, until, group_by, metrics=metrics, conn=conn)
+    conn.close()
+    
+    if args.format == "json":
+        print(json.dumps({
+            "since": datetime.fromtimestamp(since).isoformat(timespec="seconds"),
+            "until": datetime.fromtimestamp(until).isoformat(timespec="seconds"),
+            "resolution": res,
+            "rows": rows
+        }, ensure_ascii=False, indent=2))
+        return
+    
+    columns = group_by + ["count"] + (["avg"] if any("avg" in r for r in rows) else [])
+    widths = [max([len(c)] + [len(str(r.get(c, ""))) for r in rows]) for c in columns]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(str(row.get(c, "")).ljust(w) for c, w in zip(columns, widths)))
+
+
+def main(argv=None):
+    import argparse
+    import sys
+    
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["query"]:
+        return query_main(argv[1:])
+    
+    parser = argparse.ArgumentParser(
+        description="Collect OpenClaw health data as JSON",
+        epilog="Long-range queries: health_fetcher.py query --since 7d --group-by provider,hour"
+    )
+    parser.add_argument("--hours", type=int, default=2,
+                        help="Analysis window in hours (default: 2)")
+    parser.add_argument("--cached", action="store_true",
+                        help="Serve the stored snapshot, rebuilding only stale sections")
+    parser.add_argument("--ttl", type=int, default=SNAPSHOT_TTL_SECONDS,
+                        help="Max age in seconds of a cached section (with --cached)")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Rebuild and store the snapshot without printing it")
+    parser.add_argument("--compact", action="store_true",
+                        help="Emit a deduplicated, size-bounded payload, diffed against the previous one")
+    parser.add_argument("--budget", type=int, default=REPORT_BUDGET_BYTES,
+                        help="Target payload size in bytes (with --compact)")
+    args = parser.parse_args(argv)
+    
+    hours = args.hours
+    
+    # Rollups are ingested while the logs section is rebuilt: on every --refresh
+    # (scheduled by the audit LaunchAgent), but not when --cached reuses it
+    snapshot = get_snapshot(hours, ttl=args.ttl if args.cached and not args.refresh else None)
+    if args.refresh:
+        return
+    
+    output = render_snapshot(snapshot)
+    if not args.compact:
+        print(json.dumps(output, ensure_ascii=False, indent=2))
+        return
+    
+    try:
+        with open(LAST_REPORT_FILE, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = None
+    print(_encode(build_report_payload(output, args.budget, previous)))
+    try:
+        write_json_atomic(LAST_REPORT_FILE, output)
+    except OSError as e:
+        print(f"Error writing last report: {e}", file=os.sys.stderr)
 
 
 if __name__ == "__main__":
@@ -7,9 +7,16 @@
 # Portable paths - works for any user
 HOME_DIR="$HOME"
 OPENCLAW_BIN="${HOME_DIR}/.npm-global/bin/openclaw"
+OPENCLAW_BIN_CACHE="${HOME_DIR}/.openclaw/guardian/openclaw-bin.cache"
 SCRIPTS_DIR="${HOME_DIR}/.openclaw/scripts/openclaw-guardian"
 HEALTH_FETCHER="${SCRIPTS_DIR}/health_fetcher.py"
 
+# Prefer the path the watchdog already resolved and cached
+if [ -f "$OPENCLAW_BIN_CACHE" ]; then
+    CACHED_BIN=$(cat "$OPENCLAW_BIN_CACHE")
+    [ -x "$CACHED_BIN" ] && OPENCLAW_BIN="$CACHED_BIN"
+fi
+
 # Fallback: try system openclaw if npm-global not found
 if [ ! -f "$OPENCLAW_BIN" ]; then
     OPENCLAW_BIN=$(command -v openclaw 2>/dev/null || echo "/usr/local/bin/openclaw")
@@ -18,7 +25,9 @@ fi
 # 1. Pre-fetch Health Data (2 hour window)
 echo "📥 Fetching system health data from logs..."
 if [ -f "$HEALTH_FETCHER" ]; then
-    HEALTH_DATA_JSON=$("$HEALTH_FETCHER" 2>/dev/null || echo '{"error": "fetch_failed"}')
+    # --cached serves the materialized snapshot; only stale sections are rebuilt.
+    # --compact keeps the prompt bounded: repeats collapsed, unchanged sections elided.
+    HEALTH_DATA_JSON=$("$HEALTH_FETCHER" --cached --compact --budget 4096 2>/dev/null || echo '{"error": "fetch_failed"}')
 else
     HEALTH_DATA_JSON='{"error": "health_fetcher.py not found", "path": "'"$HEALTH_FETCHER"'"}'
 fi
@@ -34,6 +43,7 @@ TASK_PROMPT="你现在是 OpenClaw 系统监察员。请根据下方提供的过
     - 检查定时任务执行实况（哪些成功，哪些耗时过长）。
 3. **适配手机端**：单级列表，粗体关键词，Emoji 导航。
 4. **排除噪音**：不需要再追踪 GitHub Stars。
+5. **数据说明**：`unchanged` 中列出的部分与上次报告相同，简述"无变化"即可；`omitted` 为因篇幅省略的条目数；带 `count`/`first`/`last` 的条目是合并后的重复事件。
 
 附加数据（过去 2 小时真实快照）：
 ${HEALTH_DATA_JSON}